@@ -0,0 +1,9 @@
+"""
+Benchmarks for the Hua Rong Dao solver.
+
+corpus holds the layouts that are timed, run times every search mode on
+them and compares the numbers with a saved baseline:
+
+    python -m benchmarks.run                # compare with benchmarks/baseline.json
+    python -m benchmarks.run --update       # save this run as the baseline
+"""
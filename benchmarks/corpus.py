@@ -0,0 +1,86 @@
+"""
+The layouts the benchmarks are run on: a few fixed layouts and boards drawn
+at random, by seed, from every board a set of pieces can reach the goal from.
+"""
+
+from random import Random
+
+import hrd
+
+# fixed layouts, five rows of four symbols as in a puzzle file
+named_layouts = {
+    # the classic opening: Guan Yu ('<>') across the middle, four generals
+    # ('^v') standing and four soldiers ('2') at the bottom
+    'heng_dao_li_ma': '^11^\n'
+                      'v11v\n'
+                      '^<>^\n'
+                      'v22v\n'
+                      '2..2\n',
+    # the start of the solutions shipped in astar_soln.txt and dfs_soln.txt
+    'soln_dump': '11<>\n'
+                 '11^2\n'
+                 '^^v2\n'
+                 'vv22\n'
+                 '.<>.\n',
+    # every general lying down, the goal piece between two soldiers
+    'all_across': '2112\n'
+                  '2112\n'
+                  '<><>\n'
+                  '<><>\n'
+                  '.<>.\n',
+    # one move from the goal
+    'one_move': '^<>^\n'
+                'v<>v\n'
+                '^11^\n'
+                'v11v\n'
+                '2..2\n',
+}
+
+# difficulty -> the band of optimal solution lengths, as fractions of the
+# longest optimal solution the pieces have
+difficulty_bands = {
+    'easy': (0.1, 0.3),
+    'medium': (0.4, 0.6),
+    'hard': (0.8, 1.0),
+}
+
+
+def random_layouts(base, count=2, seed=0):
+    """
+    Boards with the pieces of a named layout, drawn from each difficulty
+    band. Every board is taken from the distance table of the pieces, so
+    each one can be solved; the same seed always gives the same boards.
+
+    :param base: The name of the layout whose pieces are used.
+    :type base: str
+    :param count: The boards drawn from each band.
+    :type count: int
+    :param seed: The seed of the draw.
+    :type seed: int
+    :return: The layouts by name, e.g. 'heng_dao_li_ma_hard_0'.
+    :rtype: Dict[str, str]
+    """
+    dist = hrd.build_distance_table(hrd.parse_board(named_layouts[base], 'bits'))
+    longest = max(dist.values())
+    # sorted so the draw does not depend on the order of the dict
+    keys = sorted(dist)
+    rng = Random(seed)
+    out = {}
+    for difficulty, (low, high) in difficulty_bands.items():
+        band = [key for key in keys if low * longest <= dist[key] <= high * longest]
+        for i, key in enumerate(rng.sample(band, count)):
+            board = hrd.board_from_key(key)
+            out['{}_{}_{}'.format(base, difficulty, i)] = hrd.board_text(board)
+    return out
+
+
+def load_corpus(count=2, seed=0):
+    """
+    :return: The named layouts and the random boards drawn with the pieces
+        of heng_dao_li_ma and soln_dump, by name.
+    :rtype: Dict[str, str]
+    """
+    corpus = dict(named_layouts)
+    for base in ('heng_dao_li_ma', 'soln_dump'):
+        corpus.update(random_layouts(base, count, seed))
+    return corpus
@@ -0,0 +1,218 @@
+"""
+Time every search mode on the benchmark corpus and compare with a baseline.
+
+Each run parses the layout, solves it and writes the solution to memory,
+so the time is end to end; the time of each phase comes from the
+SearchStats of the run. A run counts as a regression when it no longer
+solves the layout, finds a longer solution, or expands more states than
+the baseline by more than the threshold.
+
+Time is only compared with --check-time, since it only means something
+against a baseline saved on the same machine: the comparison is refused
+when the baseline was saved on another host, platform or Python. Single
+runs are too short to time reliably, so time is compared on the total of
+each mode over the layouts, with the same threshold.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import time
+
+import hrd
+from benchmarks.corpus import load_corpus
+
+# mode name -> keyword arguments for hrd.solve, plus the engine
+modes = {
+    'dfs': {'algo': 'dfs'},
+    'astar': {'algo': 'astar'},
+    'astar-bits': {'algo': 'astar', 'engine': 'bits'},
+    'astar-pdb': {'algo': 'astar', 'engine': 'bits', 'heuristic': 'pdb'},
+    'bibfs': {'algo': 'bibfs', 'engine': 'bits'},
+    'idastar': {'algo': 'idastar', 'engine': 'bits', 'heuristic': 'pdb'},
+    'npbfs': {'algo': 'npbfs', 'engine': 'bits'},
+    'extbfs': {'algo': 'extbfs', 'engine': 'bits'},
+}
+
+# states a run may expand, so a mode that is hopeless on a layout stops
+max_nodes = 50000
+
+baseline_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def run_one(text, mode, repeat=1):
+    """
+    Solve one layout with one mode, repeat times, and keep the fastest run.
+
+    :return: The status, moves, nodes expanded, end to end time and the
+        SearchStats report of the fastest run.
+    :rtype: dict
+    """
+    options = dict(modes[mode])
+    engine = options.pop('engine', 'grid')
+    best = None
+    for i in range(repeat):
+        stats = hrd.SearchStats(timed=True)
+        start = time.perf_counter()
+        board = hrd.parse_board(text, engine)
+        solution = hrd.solve(board, limits={'max_nodes': max_nodes}, stats=stats, **options)
+        hrd.write_solution(solution, io.StringIO())
+        elapsed = time.perf_counter() - start
+        if best == None or elapsed < best['time']:
+            best = {'status': solution.status, 'moves': solution.moves,
+                    'nodes': stats.expanded, 'time': round(elapsed, 6),
+                    'stats': stats.report()}
+    return best
+
+
+def run(corpus, mode_names, repeat=1):
+    """
+    :return: The result of every layout and mode, by 'layout/mode'.
+    :rtype: Dict[str, dict]
+    """
+    results = {}
+    for name, text in corpus.items():
+        for mode in mode_names:
+            result = run_one(text, mode, repeat)
+            results[name + '/' + mode] = result
+            print('{:32} {:11} {:12} moves {!s:>5} nodes {:>7} {:8.3f}s'.format(
+                name, mode, result['status'], result['moves'], result['nodes'], result['time']), flush=True)
+    return results
+
+
+def host():
+    """
+    :return: What a baseline records of the machine it was saved on.
+    :rtype: Dict[str, str]
+    """
+    return {'node': platform.node(), 'platform': platform.platform(),
+            'machine': platform.machine(), 'python': platform.python_version()}
+
+
+def compare(results, baseline, threshold, check_time=False):
+    """
+    :param check_time: Also compare the total time of each mode.
+    :type check_time: bool
+    :return: A line for every run that regressed against the baseline.
+    :rtype: List[str]
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]
+        if base['status'] == 'solved' and result['status'] != 'solved':
+            regressions.append('{}: {} instead of solved'.format(name, result['status']))
+            continue
+        if base['moves'] != None and result['moves'] != None and result['moves'] > base['moves']:
+            regressions.append('{}: {} moves, was {}'.format(name, result['moves'], base['moves']))
+        if result['nodes'] > base['nodes'] * (1 + threshold):
+            regressions.append('{}: {} nodes, was {}'.format(name, result['nodes'], base['nodes']))
+    if not check_time:
+        return regressions
+
+    # mode -> [time of this run, time of the baseline]
+    totals = {}
+    for name, result in results.items():
+        if name in baseline:
+            total = totals.setdefault(name.split('/')[1], [0, 0])
+            total[0] += result['time']
+            total[1] += baseline[name]['time']
+    for mode in sorted(totals):
+        run_time, base_time = totals[mode]
+        if run_time > base_time * (1 + threshold):
+            regressions.append('{}: {:.3f}s in total, was {:.3f}s'.format(mode, run_time, base_time))
+    return regressions
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        default=baseline_file,
+        help="The baseline to compare with, or to write with --update."
+    )
+    parser.add_argument(
+        "--update",
+        action='store_true',
+        help="Save this run as the baseline instead of comparing."
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="How much slower, or how many more states, counts as a regression (0.25 is 25%%)."
+    )
+    parser.add_argument(
+        "--check-time",
+        action='store_true',
+        help="Also count a mode that got slower as a regression. The baseline has to be saved on this machine."
+    )
+    parser.add_argument(
+        "--modes",
+        type=str,
+        nargs='+',
+        default=sorted(modes),
+        choices=sorted(modes),
+        help="The search modes to run."
+    )
+    parser.add_argument(
+        "--layouts",
+        type=str,
+        nargs='+',
+        help="Only run these layouts of the corpus."
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Runs of each layout and mode, the fastest is kept."
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="The seed the random layouts are drawn with."
+    )
+    args = parser.parse_args()
+
+    corpus = load_corpus(seed=args.seed)
+    if args.layouts != None:
+        unknown = [name for name in args.layouts if name not in corpus]
+        if len(unknown) > 0:
+            parser.error("unknown layouts: " + ', '.join(unknown))
+        corpus = {name: corpus[name] for name in args.layouts}
+
+    results = run(corpus, args.modes, args.repeat)
+
+    if args.update:
+        baseline_out = open(args.baseline, "w")
+        saved = dict(host())
+        saved.update({'layouts': corpus, 'results': results})
+        json.dump(saved, baseline_out, indent=1, sort_keys=True)
+        baseline_out.write('\n')
+        baseline_out.close()
+        sys.exit(0)
+
+    baseline_in = open(args.baseline, "r")
+    baseline = json.load(baseline_in)
+    baseline_in.close()
+    changed = [name for name in corpus if name in baseline['layouts'] and baseline['layouts'][name] != corpus[name]]
+    if len(changed) > 0:
+        print('layouts differ from the baseline, compare with the same --seed: ' + ', '.join(changed))
+        sys.exit(2)
+    if args.check_time:
+        other = [field for field, value in host().items() if baseline.get(field) != value]
+        if len(other) > 0:
+            print('the baseline was saved on another machine ({} differ), times cannot be compared; '
+                  'save one here with --update or drop --check-time'.format(', '.join(other)))
+            sys.exit(2)
+    regressions = compare(results, baseline['results'], args.threshold, args.check_time)
+    for line in regressions:
+        print('REGRESSION ' + line)
+    sys.exit(1 if len(regressions) > 0 else 0)
@@ -1,767 +1,4026 @@
-from copy import deepcopy
-from heapq import heapify, heappush, heappop
-import time
-import argparse
-import sys
-
-#====================================================================================
-
-char_goal = '1'
-char_single = '2'
-
-class Piece:
-    """
-    This represents a piece on the Hua Rong Dao puzzle.
-    """
-
-    def __init__(self, is_goal, is_single, coord_x, coord_y, orientation):
-        """
-        :param is_goal: True if the piece is the goal piece and False otherwise.
-        :type is_goal: bool
-        :param is_single: True if this piece is a 1x1 piece and False otherwise.
-        :type is_single: bool
-        :param coord_x: The x coordinate of the top left corner of the piece.
-        :type coord_x: int
-        :param coord_y: The y coordinate of the top left corner of the piece.
-        :type coord_y: int
-        :param orientation: The orientation of the piece (one of 'h' or 'v') 
-            if the piece is a 1x2 piece. Otherwise, this is None
-        :type orientation: str
-        """
-
-        self.is_goal = is_goal
-        self.is_single = is_single
-        self.coord_x = coord_x
-        self.coord_y = coord_y
-        self.orientation = orientation
-
-    # print out the attributes of a piece for debugging
-    def __repr__(self):
-        return '{} {} {} {} {}'.format(self.is_goal, self.is_single, \
-            self.coord_x, self.coord_y, self.orientation)
-
-    # USELESS
-    # move a piece 
-    # check legality prior to calling 
-    def move(self, x, y):
-        # move is + or - 1 
-        self.coord_x += x
-        self.coord_y += y
-
-
-class Board:
-    """
-    Board class for setting up the playing board.
-    """
-
-    def __init__(self, pieces):
-        """
-        :param pieces: The list of Pieces
-        :type pieces: List[Piece]
-        """
-        # board size is static
-        self.width = 4
-        self.height = 5
-
-        self.pieces = pieces
-
-        # self.grid is a 2-d (size * size) array automatically generated
-        # using the information on the pieces when a board is being created.
-        # A grid contains the symbol for representing the pieces on the board.
-        self.grid = []
-        self.__construct_grid()
-
-    def __construct_grid(self):
-        """
-        Called in __init__ to set up a 2-d grid based on the piece location information.
-
-        """
-
-        for i in range(self.height):
-            line = []
-            for j in range(self.width):
-                line.append('.')
-            self.grid.append(line)
-
-        for piece in self.pieces:
-            if piece.is_goal:
-                self.grid[piece.coord_y][piece.coord_x] = char_goal
-                self.grid[piece.coord_y][piece.coord_x + 1] = char_goal
-                self.grid[piece.coord_y + 1][piece.coord_x] = char_goal
-                self.grid[piece.coord_y + 1][piece.coord_x + 1] = char_goal
-            elif piece.is_single:
-                self.grid[piece.coord_y][piece.coord_x] = char_single
-            else:
-                if piece.orientation == 'h':
-                    self.grid[piece.coord_y][piece.coord_x] = '<'
-                    self.grid[piece.coord_y][piece.coord_x + 1] = '>'
-                elif piece.orientation == 'v':
-                    self.grid[piece.coord_y][piece.coord_x] = '^'
-                    self.grid[piece.coord_y + 1][piece.coord_x] = 'v'
-                    '''if ( (piece.coord_y + 1, piece.coord_x) == (4, 0)):
-                        #self.display()
-                        #print('\n')'''
-
-    def display(self):
-        """
-        Print out the current board.
-
-        """
-        for i, line in enumerate(self.grid):
-            for ch in line:
-                if ch != None:
-                    print(ch, end='')
-                
-            print()
-        
-        return 1
-    
-    # find the two empty spaces on the board
-    # use pg 3/7 bottom half to help you with this
-    def find_empty(self):
-        empty = []
-        col = 0
-        for i, line in enumerate(self.grid):
-            for ch in line:
-                if ch == '.':
-                    empty.append((i, col))
-                col += 1
-            col = 0
-        # list of tuple for each '.' position
-        return empty
-
-    # all plausible moves
-    def legality(self):
-        loc_e = self.find_empty()
-        sp1 = (loc_e[0][0], loc_e[0][1])
-        sp2 = (loc_e[1][0], loc_e[1][1])
-        legal_moves = []
-        #print("135")
-
-        # space is horizantal and beside each other
-        if ((sp1[0] == sp2[0]) and (abs(sp1[1] - sp2[1]) == 1)):
-            # 4 by 4 (holds for when spaces are also not beside each other)
-            # check spaces are beside
-            # Goal is above
-            if (((sp1[0] - 2 >= 0) and (sp2[0] - 2 >= 0))) and (((self.grid[sp1[0] - 1][sp1[1]] == char_goal) and (self.grid[sp2[0] - 1][sp2[1]] == char_goal)) and ((self.grid[sp1[0] - 2][sp1[1]] == char_goal) and (self.grid[sp2[0] - 2][sp2[1]] == char_goal))):
-                legal_moves.append(([(sp1[0] - 2, sp1[1]), (sp2[0] - 2, sp2[1])], char_goal, 2, [sp1, sp2], "x"))
-            # Goal is below
-            if (((sp1[0] + 2 < 5) and (sp2[0] + 2 < 5))) and (((self.grid[sp1[0] + 1][sp1[1]] == char_goal) and (self.grid[sp2[0] + 1][sp2[1]] == char_goal)) and ((self.grid[sp1[0] + 2][sp1[1]] == char_goal) and (self.grid[sp2[0] + 2][sp2[1]] == char_goal))):
-                legal_moves.append(([(sp1[0] + 2, sp1[1]), (sp2[0] + 2, sp2[1])], char_goal, 2, [sp1, sp2], "x"))
-            
-            # 2 by 1 
-            # for RHS empty 
-            # --<>
-            if (sp1[1] + 2 < 4 and sp2[1] + 2 < 4) and (self.grid[sp1[0]][sp1[1] + 2] == '<' and self.grid[sp2[0]][sp2[1] + 2] == '>'):
-                #print("\n 155")
-                legal_moves.append((([(sp1[0], sp1[1] + 2), (sp2[0], sp2[1] + 2)]), '<>', 2, [sp1, sp2], "y"))
-            # for LHS empty
-            # <>--
-            #print("150")
-            if (sp1[1] - 2 >= 0 and sp2[1] - 2 >= 0) and (self.grid[sp1[0]][sp1[1] - 2] == '<' and self.grid[sp2[0]][sp2[1] - 2] == '>'):
-                #print("\n 151")
-                legal_moves.append((([(sp1[0], sp1[1] - 2), (sp2[0], sp2[1] - 2)]), '<>', 2, [sp1, sp2], "y"))
-                #self.display()
-            # for bottom push
-            # --
-            # <> 
-            if (sp1[0] + 1 < 5 and sp2[0] + 1 < 5) and (self.grid[sp1[0] + 1][sp1[1]] == '<' and self.grid[sp2[0] + 1][sp2[1]] == '>'):
-                #print("\n 155")
-                legal_moves.append((([(sp1[0] + 1, sp1[1]), (sp2[0] + 1, sp2[1])]), '<>', 2, [sp1, sp2], "x"))
-            # for top push 
-            # <>
-            # --
-            if (sp1[0] - 1 >= 0 and sp2[0] - 1 >= 0) and (self.grid[sp1[0] - 1][sp1[1]] == '<' and self.grid[sp2[0] - 1][sp2[1]] == '>'):
-                #print("\n 155")
-                legal_moves.append((([(sp1[0] - 1, sp1[1]), (sp2[0] - 1, sp2[1])]), '<>', 2, [sp1, sp2], "x"))
-
-        # space is vertical
-        # sp1 is above sp2 or sp1 is below sp2
-        if (abs(sp1[0] - sp2[0]) == 1) and (sp1[1] == sp2[1]):           
-            # 4 by 4
-            # check spaces are beside
-            # Goal is above
-            if ((sp1[1] - 1 >= 0) and (sp2[1] - 2 >= 0)) and (((self.grid[sp1[0]][sp1[1] - 1] == char_goal) and (self.grid[sp2[0]][sp2[1] - 1] == char_goal)) and ((self.grid[sp1[0]][sp1[1] - 2] == char_goal) and (self.grid[sp2[0]][sp2[1] - 2] == char_goal))):
-                legal_moves.append(([(sp1[0], sp1[1] - 2), (sp2[0], sp2[1] - 2)], char_goal, 2, [sp1, sp2], "y"))
-            # Goal is below
-            if ((sp1[1] + 1 < 4) and (sp2[1] + 2 < 4)) and (((self.grid[sp1[0]][sp1[1] + 1] == char_goal) and (self.grid[sp2[0]][sp2[1] + 1] == char_goal)) and ((self.grid[sp1[0]][sp1[1] + 2] == char_goal) and (self.grid[sp2[0]][sp2[1] + 2] == char_goal))):
-                legal_moves.append(([(sp1[0], sp1[1] + 2), (sp2[0], sp2[1] + 2)], char_goal, 2, [sp1, sp2], "y"))
-
-            # 1 by 2 
-            # for LHS empty
-            # ^ -
-            # v -
-            if (sp1[1] - 1 >= 0 and sp2[1] - 1 >= 0) and ((self.grid[sp1[0]][sp1[1] - 1] == '^') and (self.grid[sp2[0]][sp2[1] - 1] == 'v')):
-                legal_moves.append(([(sp1[0], sp1[1] - 1),(sp2[0], sp2[1] - 1)],'^v', 2, [sp1, sp2], "y"))
-            # for RHS empty 
-            # - ^
-            # - v
-            if (sp1[1] + 1 < 4 and sp2[1] + 1 < 4) and (self.grid[sp1[0]][sp1[1] + 1] == '^' and self.grid[sp2[0]][sp2[1] + 1] == 'v'):
-                legal_moves.append(([(sp1[0], sp1[1] + 1),(sp2[0], sp2[1] + 1)],'^v', 2, [sp1, sp2], "y"))
-            # for bottom push
-            # -
-            # -
-            # ^
-            # v
-            #if (sp1[0] + 2 < 5 and sp2[0] + 2 < 5) and (self.grid[sp1[0] + 2][sp1[1]] == '^' and self.grid[sp2[0] + 2][sp2[1]] == 'v'):
-                #legal_moves.append(([(sp1[0] + 2, sp1[1]),(sp2[0] + 2, sp2[1])],'^v', 2, [sp1, sp2], "x"))
-            # for top push
-            # ^
-            # v
-            # -
-            # -
-            #if (sp1[0] - 2 >= 0 and sp2[0] - 2 >= 0) and (self.grid[sp1[0] - 2][sp1[1]] == '^' and self.grid[sp2[0] - 2][sp2[1]] == 'v'):
-                #legal_moves.append(([(sp1[0] - 2, sp1[1]),(sp2[0] - 2, sp2[1])],'^v', 2, [sp1, sp2], "x"))
-        
-        # 2 by 1 and Singles (holds for when spaces are not beside each other)
-        # -<> is on the right
-        if (sp1[1] + 1 < 4 and sp1[1] + 2 < 4) and (self.grid[sp1[0]][sp1[1] + 1] == '<' and self.grid[sp1[0]][sp1[1] + 2] == '>'):
-            legal_moves.append(([(sp1[0], sp1[1] + 1),(sp1[0], sp1[1] + 2)],'<>', 1, [sp1], "x"))
-        # -<> is on the right
-        if (sp2[1] + 1 < 4 and sp2[1] + 2 < 4) and (self.grid[sp2[0]][sp2[1] + 1] == '<' and self.grid[sp2[0]][sp2[1] + 2] == '>'):
-            legal_moves.append(([(sp2[0], sp2[1] + 1),(sp2[0], sp2[1] + 2)],'<>', 1, [sp2], "x"))   
-        # for LHS empty 
-        if (sp2[1] - 1 >= 0 and sp2[1] - 2 >= 0) and (self.grid[sp2[0]][sp2[1] - 1] == '>' and self.grid[sp2[0]][sp2[1] - 2] == '>'):
-            legal_moves.append(([(sp2[0], sp2[1] - 1),(sp2[0], sp2[1] - 2)],'<>', 1, [sp2], "x"))
-        # for LHS empty
-        # <>- on the left
-        if (sp1[1] - 1 >= 0 and sp1[1] - 2 >= 0) and (self.grid[sp1[0]][sp1[1] - 1] == '>' and self.grid[sp1[0]][sp1[1] - 2] == '>'):
-            legal_moves.append(([(sp1[0], sp1[1] - 1),(sp1[0], sp1[1] - 2)],'<>', 1, [sp1], "x"))     
-
-        # spaces are not together  
-        # 1 by 2 (holds for when spaces are not beside each other)
-        # for LHS empty
-        # ^
-        # v is above
-        # -
-        if (sp1[0] - 1 >= 0 and sp1[0] - 2 >= 0) and (self.grid[sp1[0] - 1][sp1[1]] == 'v' and self.grid[sp1[0] - 2][sp1[1]] == '^'):           
-            #input()
-            #print("lINE 185", sp1)
-            #self.display()
-            #self.display()
-            legal_moves.append(([(sp1[0] - 1, sp1[1]),(sp1[0] - 2, sp1[1])],'^v', 1, [sp1], "x"))
-            #print('\n', self.grid[sp1[0] - 1][sp1[1]], self.grid[sp1[0] - 2][sp1[1]], '\n')
-        # -
-        # ^
-        # v is below
-        if (sp1[0] + 1 < 5 and sp1[0] + 2 < 5) and (self.grid[sp1[0] + 1][sp1[1]] == '^' and self.grid[sp1[0] + 2][sp1[1]] == 'v'):
-            #print("lINE 188 HERE ERROR?")
-            legal_moves.append(([(sp1[0] + 1, sp1[1]),(sp1[0] + 2, sp1[1])],'^v', 1, [sp1], "x"))
-        # ^
-        # v is above
-        # -
-        if (sp2[0] - 1 >= 0 and sp2[0] - 2 >= 0) and (self.grid[sp2[0] - 1][sp2[1]] == 'v' and self.grid[sp2[0] - 2][sp2[1]] == '^'):
-            #print("lINE 192")
-            '''print(sp2)'''
-            legal_moves.append(([(sp2[0] - 1, sp2[1]),(sp2[0] - 2, sp2[1])],'^v', 1, [sp2], "y"))
-            #print(self.grid[sp2[0] - 1][sp2[1]], self.grid[sp2[0] - 2][sp2[1]])
-        # -
-        # ^
-        # v is below
-        if (sp2[0] + 1 < 5 and sp2[0] + 2 < 5) and (self.grid[sp2[0] + 1][sp2[1]] == '^' and self.grid[sp2[0] + 2][sp2[1]] == 'v'):
-            #print("lINE 197")
-            legal_moves.append(([(sp2[0] + 1, sp2[1]),(sp2[0] + 2, sp2[1])],'^v', 1, [sp2], "y"))
-
-        # single
-        if (sp1[0] - 1 >= 0) and (self.grid[sp1[0] - 1][sp1[1]] == char_single):
-            legal_moves.append(([(sp1[0] - 1, sp1[1])], char_single, 1, [sp1], "x"))
-        if (sp1[0] + 1 < 5) and (self.grid[sp1[0] + 1][sp1[1]] == char_single):
-            legal_moves.append(([(sp1[0] + 1, sp1[1])], char_single, 1, [sp1], "x"))
-        if (sp1[1] - 1 >= 0) and (self.grid[sp1[0]][sp1[1] - 1] == char_single):
-            legal_moves.append(([(sp1[0], sp1[1] - 1)], char_single, 1, [sp1], "y"))
-        if (sp1[1] + 1 < 4) and self.grid[sp1[0]][sp1[1] + 1] == char_single:
-            legal_moves.append(([(sp1[0], sp1[1] + 1)], char_single, 1, [sp1], "y"))
-        if (sp2[0] - 1 >= 0) and (self.grid[sp2[0] - 1][sp2[1]] == char_single):
-            legal_moves.append(([(sp2[0] - 1, sp2[1])], char_single, 1, [sp2], "x"))  
-        if (sp2[0] + 1 < 5) and (self.grid[sp2[0] + 1][sp2[1]] == char_single):
-            legal_moves.append(([(sp2[0] + 1, sp2[1])], char_single, 1, [sp2], "x"))    
-        if (sp2[1] - 1 >= 0) and (self.grid[sp2[0]][sp2[1] - 1] == char_single):
-            legal_moves.append(([(sp2[0], sp2[1] - 1)], char_single, 1, [sp2], "y"))    
-        if (sp2[1] + 1 < 4) and (self.grid[sp2[0]][sp2[1] + 1] == char_single):
-            legal_moves.append(([(sp2[0], sp2[1] + 1)], char_single, 1, [sp2], "y"))          
-    
-        return legal_moves
-    
-
-    # check if the goal peice is at the bottom opening [(4,1), (4,2)]
-    def goal_test(self):
-        col = 0
-        goal_pos = []
-        # find the goal piece
-        for i, line in enumerate(self.grid):
-            for ch in line:
-                if ch == "1":
-                    goal_pos.append((i, col))
-                col += 1
-            col = 0
-        if goal_pos == [(3, 1), (3, 2), (4, 1), (4, 2)]:
-            return True
-        return False 
-                    
-
-# successor function
-# change board configuration per space
-# func calling this should call this twice
-def change_board(move, changed_board, board):
-
-    # make the board to change a copy of the current board
-    for x in range(len(board.grid)):
-        for y in range(len(board.grid[x])):
-            if board.grid[x][y] != changed_board.grid[x][y]:
-                changed_board.grid[x][y] = board.grid[x][y]
-
-    #print(move, len(move[-2]), len(move[-5]))
-    if len(move[-2]) > 1:   # spaces
-        sp1 = move[-2][0]
-        sp2 = move[-2][1]
-        if len(move[-5]) > 1:   # num of piece's on grid spot
-            pos = move[-5]
-            p_mov = move[-4]
-            if p_mov == char_goal:
-                if (pos[0][0] == sp1[0] - 2) and (pos[0][1] == sp1[1]) and (pos[1][0] == sp2[0] - 2) and (pos[1][1] == sp2[1]):     # push 2 by 2 down
-                    changed_board.grid[sp1[0] - 2][sp1[1]] = '.'
-                    changed_board.grid[sp2[0] - 2][sp2[1]] = '.'
-                    changed_board.grid[sp1[0] - 1][sp1[1]] = char_goal
-                    changed_board.grid[sp2[0] - 1][sp2[1]] = char_goal
-                    changed_board.grid[sp1[0]][sp1[1]] = char_goal
-                    changed_board.grid[sp2[0]][sp2[1]] = char_goal
-                    return changed_board
-                elif (pos[0][0] == sp1[0] + 2) and (pos[0][1] == sp1[1]) and (pos[1][0] == sp2[0] + 2) and (pos[1][1] == sp2[1]):     # push 2 by 2 up
-                    changed_board.grid[sp1[0] + 2][sp1[1]] = '.'
-                    changed_board.grid[sp2[0] + 2][sp2[1]] = '.'
-                    changed_board.grid[sp1[0] + 1][sp1[1]] = char_goal
-                    changed_board.grid[sp2[0] + 1][sp2[1]] = char_goal
-                    changed_board.grid[sp1[0]][sp1[1]] = char_goal
-                    changed_board.grid[sp2[0]][sp2[1]] = char_goal
-                    return changed_board
-                elif (pos[0][0] == sp1[0]) and (pos[0][1] == sp1[1] - 2) and (pos[1][0] == sp2[0]) and (pos[1][1] == sp2[1] - 2):     # push 2 by 2 to the left 
-                    changed_board.grid[sp1[0]][sp1[1] - 2] = '.'
-                    changed_board.grid[sp2[0]][sp2[1] - 2] = '.'
-                    changed_board.grid[sp1[0]][sp1[1] - 1] = char_goal
-                    changed_board.grid[sp2[0]][sp2[1] - 1] = char_goal
-                    changed_board.grid[sp1[0]][sp1[1]] = char_goal
-                    changed_board.grid[sp2[0]][sp2[1]] = char_goal
-                    return changed_board
-                elif (pos[0][0] == sp1[0]) and (pos[0][1] == sp1[1] + 2) and (pos[1][0] == sp2[0]) and (pos[1][1] == sp2[1] + 2):     # push 2 by 2 to the right 
-                    changed_board.grid[sp1[0]][sp1[1] + 2] = '.'
-                    changed_board.grid[sp2[0]][sp2[1] + 2] = '.'
-                    changed_board.grid[sp1[0]][sp1[1] + 1] = char_goal
-                    changed_board.grid[sp2[0]][sp2[1] + 1] = char_goal
-                    changed_board.grid[sp1[0]][sp1[1]] = char_goal
-                    changed_board.grid[sp2[0]][sp2[1]] = char_goal
-                    return changed_board
-            elif p_mov == '<>':
-                if (pos[0][0] == sp1[0]) and (pos[0][1] == sp1[1] - 2) and (pos[1][0] == sp2[0]) and (pos[1][1] == sp2[1] - 2):     # push 2 by 1 right by 2 spaces
-                    #print('355')
-                    '''changed_board.display()
-                    input()
-                    board.display()
-                    input()'''
-                    changed_board.grid[sp1[0]][sp1[1] - 2] = '.'
-                    changed_board.grid[sp2[0]][sp2[1] - 2] = '.'
-                    changed_board.grid[sp1[0]][sp1[1]] = '<'
-                    changed_board.grid[sp2[0]][sp2[1]] = '>'
-                    return changed_board
-                elif (pos[0][0] == sp1[0]) and (pos[0][1] == sp1[1] + 2) and (pos[1][0] == sp2[0]) and (pos[1][1] == sp2[1] + 2):    # push 2 by 1 left by 2 spaces                 
-                    #print('363')
-                    changed_board.grid[sp1[0]][sp1[1] + 2] = '.'
-                    changed_board.grid[sp2[0]][sp2[1] + 2] = '.'
-                    changed_board.grid[sp1[0]][sp1[1]] = '<'
-                    changed_board.grid[sp2[0]][sp2[1]] = '>'
-                    return changed_board
-                elif (pos[0][0] == sp1[0] + 1) and (pos[0][1] == sp1[1]) and (pos[1][0] == sp2[0] + 1) and (pos[1][1] == sp2[1]):     # push 2 by 1 up by 1 space
-                    #print('371')
-                    changed_board.grid[sp1[0] + 1][sp1[1]] = '.'
-                    changed_board.grid[sp2[0] + 1][sp2[1]] = '.'
-                    changed_board.grid[sp1[0]][sp1[1]] = '<'
-                    changed_board.grid[sp2[0]][sp2[1]] = '>'
-                    return changed_board
-                elif (pos[0][0] == sp1[0] - 1) and (pos[0][1] == sp1[1]) and (pos[1][0] == sp2[0] - 1) and (pos[1][1] == sp2[1]):     # push 2 by 1 down by 1 space
-                    #print('379')
-                    changed_board.grid[sp1[0] - 1][sp1[1]] = '.'
-                    changed_board.grid[sp2[0] - 1][sp2[1]] = '.'
-                    changed_board.grid[sp1[0]][sp1[1]] = '<'
-                    changed_board.grid[sp2[0]][sp2[1]] = '>'
-                    return changed_board
-            elif p_mov == '^v':
-                #print(move, move[-2], sp1)
-                if (pos[0][0] == sp1[0]) and (pos[0][1] == sp1[1] - 1) and (pos[1][0] == sp2[0]) and (pos[1][1] == sp2[1] - 1):     # push 1 by 2 right by 1 space
-                    #print("394")
-                    changed_board.grid[sp1[0]][sp1[1] - 1] = '.'
-                    changed_board.grid[sp2[0]][sp2[1] - 1] = '.'
-                    changed_board.grid[sp1[0]][sp1[1]] = '^'
-                    changed_board.grid[sp2[0]][sp2[1]] = 'v'
-                    return changed_board
-                elif (pos[0][0] == sp1[0]) and (pos[0][1] == sp1[1] + 1) and (pos[1][0] == sp2[0]) and (pos[1][1] == sp2[1] + 1):    # push 1 by 2 left by 1 space
-                    changed_board.grid[sp1[0]][sp1[1] + 1] = '.'
-                    changed_board.grid[sp2[0]][sp2[1] + 1] = '.'
-                    changed_board.grid[sp1[0]][sp1[1]] = '^'
-                    changed_board.grid[sp2[0]][sp2[1]] = 'v'
-                    return changed_board
-                elif (pos[0][0] == sp1[0] + 2) and (pos[0][1] == sp1[1]) and (pos[1][0] == sp2[0] + 2) and (pos[1][1] == sp2[1]):     # push 1 by 2 up by 2 spaces
-                    changed_board.grid[sp1[0] + 2][sp1[1]] = '.'
-                    changed_board.grid[sp2[0] + 2][sp2[1]] = '.'
-                    changed_board.grid[sp1[0]][sp1[1]] = '^'
-                    changed_board.grid[sp2[0]][sp2[1]] = 'v'
-                    return changed_board
-                elif (pos[0][0] == sp1[0] - 2) and (pos[0][1] == sp1[1]) and (pos[1][0] == sp2[0] - 2) and (pos[1][1] == sp2[1]):     # push 1 by 2 up by 2 spaces
-                    changed_board.grid[sp1[0] - 2][sp1[1]] = '.'
-                    changed_board.grid[sp2[0] - 2][sp2[1]] = '.'
-                    changed_board.grid[sp1[0]][sp1[1]] = '^'
-                    changed_board.grid[sp2[0]][sp2[1]] = 'v'
-                    return changed_board
-            
-    else:   # spaces
-        sp = move[-2][0]
-        pos = move[-5]
-        p_mov = move[-4]
-        if len(move[-5]) > 1:   # num of piece's grid spots
-            if p_mov == '^v':
-                if (pos[0][0] == sp[0] - 1) and (pos[0][1] == sp[1]) and (pos[1][0] == sp[0] - 2) and (pos[1][1] == sp[1]):     # push 1 by 2 piece down by 1 space
-                    # ^
-                    # v is above
-                    # -
-                    changed_board.grid[sp[0] - 2][sp[1]] = '.'
-                    changed_board.grid[sp[0] - 1][sp[1]] = '^'
-                    changed_board.grid[sp[0]][sp[1]] = 'v'
-                    return changed_board
-                elif (pos[0][0] == sp[0] + 1) and (pos[0][1] == sp[1]) and (pos[1][0] == sp[0] + 2) and (pos[1][1] == sp[1]):     # push 1 by 2 piece up by 1 space
-                    # -
-                    # ^
-                    # v is below
-                    changed_board.grid[sp[0] + 2][sp[1]] = '.'
-                    changed_board.grid[sp[0] + 1][sp[1]] = 'v'
-                    changed_board.grid[sp[0]][sp[1]] = '^'
-                    return changed_board
-            elif p_mov == '<>':
-                if (pos[0][0] == sp[0]) and (pos[0][1] == sp[1] - 1) and (pos[1][0] == sp[0]) and (pos[1][1] == sp[1] - 2):     # push 2 by 1 piece right by 1 space
-                    # <>- on the left
-                    #print('438')
-                    changed_board.grid[sp[0]][sp[1] - 2] = '.'
-                    changed_board.grid[sp[0]][sp[1] - 1] = '<'
-                    changed_board.grid[sp[0]][sp[1]] = '>'
-                    return changed_board
-                elif (pos[0][0] == sp[0]) and (pos[0][1] == sp[1] + 1) and (pos[1][0] == sp[0]) and (pos[1][1] == sp[1]  + 2):     # push 2 by 1 piece left by 1 space
-                    # -<> is on the right
-                    #print('447')
-                    changed_board.grid[sp[0]][sp[1] + 2] = '.'
-                    changed_board.grid[sp[0]][sp[1] + 1] = '>'
-                    changed_board.grid[sp[0]][sp[1]] = '<'
-                    return changed_board
-        else:
-            if p_mov == char_single:
-                if (pos[0][0] == sp[0] - 1) and (pos[0][1] == sp[1]):
-                    changed_board.grid[sp[0] - 1][sp[1]] = '.'
-                    changed_board.grid[sp[0]][sp[1]] = char_single
-                    #changed_board.display()
-                    return changed_board
-                elif (pos[0][0] == sp[0] + 1) and (pos[0][1] == sp[1]):
-                    changed_board.grid[sp[0] + 1][sp[1]] = '.'
-                    changed_board.grid[sp[0]][sp[1]] = char_single
-                    #changed_board.display()
-                    return changed_board
-                elif (pos[0][0] == sp[0]) and (pos[0][1] == sp[1] - 1):
-                    changed_board.grid[sp[0]][sp[1] - 1] = '.'
-                    changed_board.grid[sp[0]][sp[1]] = char_single
-                    #changed_board.display()
-                    return changed_board
-                elif (pos[0][0] == sp[0]) and (pos[0][1] == sp[1] + 1):
-                    changed_board.grid[sp[0]][sp[1] + 1] = '.'
-                    changed_board.grid[sp[0]][sp[1]] = char_single
-                    #changed_board.display()
-                    return changed_board
-    '''x = input()
-    changed_board.display()'''
-    #print('\n')
-    
-    return changed_board
-
-class State:
-    """
-    State class wrapping a Board with some extra current state information.
-    Note that State and Board are different. Board has the locations of the pieces. 
-    State has a Board and some extra information that is relevant to the search: 
-    heuristic function, f value, current depth and parent.
-    """
-
-    def __init__(self, board, f, depth, space, parent=None):
-        """
-        :param board: The board of the state.
-        :type board: Board
-        :param f: The f value of current state.
-        :type f: int
-        :param depth: The depth of current state in the search tree.
-        :type depth: int
-        :param parent: The parent of current state.
-        :type parent: Optional[State]
-        """
-        self.board = board
-        self.f = get_f(board, depth)
-        self.depth = depth
-        self.parent = parent
-        self.id = hash(board)  # The id for breaking ties.
-        # added this in
-        self.space = space
-
-    # print out the attributes of a piece for debugging
-    def __str__(self):
-        print('\n')
-        self.board.display() 
-        #self.board.grid
-        return f'\nNew: f: {self.f}, depth: {self.depth}, parent: {self.parent}, id: {self.id}, space: {self.space}'
-    
-    def __lt__(self, other):
-        if other.f > self.f:
-            return other
-        return self
-    
-    
-
-
-class Moves:
-    def __init__(self, State, count):
-        self.moves = count
-        self.state =  State
-
-# Returns a list of successor state            
-def gen_states(parent, pieces):
-    main_board = parent.board
-    out = []  # list of successor states
-    # find all the legal moves that could be played with parent's board configuration
-    #input()
-    #print("NEW board")
-    #main_board.display()
-    all_moves = main_board.legality()
-    #print(all_moves)
-    # create a new state object with the resulting board of each legal move
-    for move in all_moves:
-        space = move[-3]   # find number of spaces moved
-        # using the o.g. board to enact changes on a new board
-        changed_board = Board(pieces)
-        changed_board = change_board(move, changed_board, main_board)
-        node = State(changed_board, parent.f, parent.depth + 1, parent.space + space, parent)    
-        #print("move", move)
-        #node.board.display()
-        out.append(node)
-    out.reverse()
-    # return a list of all the states
-    return out
-
-# Return seq of states until the initial state reference
-def get_sol(state):
-    par_l = [state]
-    # add next parent
-    par = state.parent
-    while par.parent != None:
-        par = State(par.board, par.f, par.depth, par.parent)
-        par_l.append(par)
-    par_l.reverse()
-    
-    for p in par_l:
-        p.board.display()
-
-    return par_l  # initial state to the goal state
-
-
-# function that takes a state and returns the state's heuristic value
-# implement Manhattan Distance: sum of the Manhattan distances of the tiles to their goal positions
-def get_f(board, depth):
-    goal = []
-    # find the goal pieces
-    col = 0
-    for i, line in enumerate(board.grid):
-        for ch in line:
-            if ch == '1':
-                goal.append((i, col))
-            col += 1
-        col = 0
-    
-    # reff: http://theory.stanford.edu/~amitp/GameProgramming/Heuristics.html  
-    x = abs(max(goal[0][0], goal[1][0], goal[2][0], goal[3][0]) - 4)
-    y = abs(max(goal[0][1], goal[1][1], goal[2][1], goal[3][1]) - 2)
-    h = x + y
-    f = h + depth + 1
-
-    '''x = abs(goal[0][0] - 4)
-    y = abs(goal[0][1] - 2)
-    h = x + y
-    f = h + (depth + 1)'''
-
-    return f
-
-def clear_heap(front):
-    while len(front) > 0:
-        front.pop()
-
-    return front
-
-'''def DFS(init_state, pieces):
-    # start with generic search algo
-    Frontier = [(init_state.f, init_state.id, init_state.board.grid, init_state)]
-    heapify(Frontier)
-    Explored = []
-    soln_states = []
-    while len(Frontier) > 0:
-        curr_f, curr_id, curr_grid, curr = heappop(Frontier)
-        if (curr_grid in Explored) == False:
-            # this parent grid has been explored
-            Explored.append(curr_grid) 
-            if curr.board.goal_test():
-                #return get_sol(curr)
-                return curr
-            for s in gen_states(curr, pieces):
-                # main comparator is # space with id as a tie breaker
-                heappush(Frontier, (s.f, s.id, s.board.grid, s))
-              
-   
-    return None'''
-
-def DFS(init_state, pieces):
-    Frontier=[init_state]
-    #Explored = set()
-    Explored=[]
-    while len(Frontier) > 0:
-        curr = Frontier.pop()
-        #curr.board.display()
-        #input()
-        #print("this is ")
-        #print(Explored)
-        explored=False
-        for e in Explored:
-            if e.board.grid == curr.board.grid:
-                explored=True
-                break
-        #input()
-        if not explored:
-        #if curr not in Explored:
-            #Explored.add(curr)
-            Explored.append(curr)
-            if curr.board.goal_test():
-                return curr
-            new_states = gen_states(curr, pieces)
-            for s in new_states:
-                #s.board.display()
-                #input()
-                Frontier.append(s)    
-    return None
-        
-
-
-def read_from_file(filename1, filename2):
-    """
-    Load initial board from a given file.
-
-    :param filename: The name of the given file.
-    :type filename: str
-    :return: A loaded board
-    :rtype: Board
-    """
-
-    puzzle_file = open(filename1, "r")
-
-    line_index = 0
-    pieces = []
-    g_found = False
-
-    for line in puzzle_file:
-
-        for x, ch in enumerate(line):
-
-            if ch == '^': # found vertical piece
-                pieces.append(Piece(False, False, x, line_index, 'v'))
-            elif ch == '<': # found horizontal piece
-                pieces.append(Piece(False, False, x, line_index, 'h'))
-            elif ch == char_single:
-                pieces.append(Piece(False, True, x, line_index, None))
-            elif ch == char_goal:
-                if g_found == False:
-                    pieces.append(Piece(True, False, x, line_index, None))
-                    g_found = True
-        line_index += 1
-
-    puzzle_file.close()
-
-    board = Board(pieces)
-
-    # initial state and returns the first solution found by DFS
-    parent = State(board, 0, 0, 0)
-    sol = DFS(parent, pieces)
-
-    states = []
-    curr_state = sol
-    while curr_state.parent != None:
-        states.append(curr_state)
-        curr_state = curr_state.parent
-    states.append(parent)
-    states.reverse()
-
-    '''for s in states:
-        s.board.display()
-        print('\n')'''
-    #parent.board.display()
-    #print(sol)
-    
-    ''' sol_file = open(filename2, "w")
-    if sol == None:
-        ch = "None"
-        sol_file.write(ch)
-    else:
-        for s in sol:
-            for i, line in enumerate(s.board.grid):
-                for ch in line:
-                    if ch != None:
-                        sol_file.write(ch)
-                sol_file.write('\n')
-            sol_file.write('\n')'''
-    
-    sol_file = open(filename2, "w")
-    if sol == None:
-        ch = "None"
-        sol_file.write(ch)
-    else:
-        #sol.display()
-        for sol in states:
-            grid = sol.board 
-            for line in grid.grid:
-                for peice in line:
-                    sol_file.write(peice)
-                sol_file.write('\n')
-            sol_file.write('\n')
-
-    return board
-
-
-if __name__ == "__main__":
-
-    parser = argparse.ArgumentParser()
-    parser.add_argument(
-        "--inputfile",
-        type=str,
-        required=True,
-        help="The input file that contains the puzzle."
-    )
-    parser.add_argument(
-        "--outputfile",
-        type=str,
-        required=True,
-        help="The output file that contains the solution."
-    )
-    parser.add_argument(
-        "--algo",
-        type=str,
-        required=True,
-        choices=['astar', 'dfs'],
-        help="The searching algorithm."
-    )
-    args = parser.parse_args()
-
-    # read the board from the file
-    board = read_from_file(args.inputfile, args.outputfile)
-    
-
-
-# test it on more inputs
-# successor function @Intput: board , @Output: list of board 
-# legal_moves,  for each move in legal_moves : apply(board,move): @Output: Board
-# a list of boards -> will be the successor or in dfs terms neighbours of the board (@Intput)
-
+from heapq import heappush, heappop, merge as heap_merge
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from array import array
+from bisect import bisect_left
+import mmap
+import shutil
+import tempfile
+import struct
+import time
+import argparse
+import sys
+import io
+import asyncio
+import signal
+import os
+import json
+import sqlite3
+import multiprocessing
+from urllib.parse import urlsplit, parse_qs
+import queue
+try:
+    import resource
+except ImportError:  # not on Windows
+    resource = None
+try:
+    import numpy as np
+except ImportError:  # only --algo npbfs needs it
+    np = None
+
+#====================================================================================
+
+char_goal = '1'
+char_single = '2'
+
+# symbols swapped when a board is mirrored left to right
+mirror_chars = str.maketrans('<>', '><')
+
+#====================================================================================
+# Board keys
+#
+# Every board, whichever engine holds it, is keyed by its packed grid. Cell
+# (row, col) is stored in bits 3 * (row * 4 + col) to 3 * (row * 4 + col) + 2
+# as the index of its symbol in cell_chars:
+#
+#     '.' 0    '1' 1    '2' 2    '<' 3    '>' 4    '^' 5    'v' 6
+#
+# so the 20 cells take 60 bits and the key fits in an unsigned 64 bit word.
+# Only the shape drawn in each cell is stored, never which Piece covers it:
+# two boards that differ by swapping pieces of the same shape (two '2's, two
+# '^v's) have the same key. The searches, the visited sets and anything that
+# stores boards must use this key so equal shapes stay interchangeable.
+
+# 3 bit code of every grid symbol
+cell_chars = '.' + char_goal + char_single + '<>^v'
+cell_codes = {ch: code for code, ch in enumerate(cell_chars)}
+
+
+def pack_grid(grid):
+    """
+    Pack a 5x4 grid into its key.
+
+    :param grid: The grid of a board.
+    :type grid: List[List[str]]
+    :rtype: int
+    """
+    packed = 0
+    for i, line in enumerate(grid):
+        for j, ch in enumerate(line):
+            packed |= cell_codes[ch] << (3 * (i * 4 + j))
+    return packed
+
+
+def unpack_grid(packed):
+    """
+    Inverse of pack_grid.
+
+    :param packed: A packed grid.
+    :type packed: int
+    :rtype: List[List[str]]
+    """
+    return [list(row_symbols[(packed >> (12 * i)) & 0xFFF]) for i in range(5)]
+
+
+def build_row_mirror():
+    """
+    Packed row (4 cells, 12 bits) to the same row mirrored left to right.
+
+    :rtype: List[int]
+    """
+    swap = [cell_codes[ch.translate(mirror_chars)] for ch in cell_chars] + [7]
+    table = []
+    for row in range(1 << 12):
+        mirrored = 0
+        for j in range(4):
+            mirrored |= swap[(row >> (3 * j)) & 7] << (3 * (3 - j))
+        table.append(mirrored)
+    return table
+
+row_mirror = build_row_mirror()
+
+# packed row (4 cells, 12 bits) to its symbols
+row_symbols = [tuple((cell_chars + '?')[(row >> (3 * j)) & 7] for j in range(4)) for row in range(1 << 12)]
+
+
+def build_row_cells():
+    """
+    Packed row (4 cells, 12 bits) to the 4 bit masks of its empty cells,
+    goal cells, singles, left halves of horizontals and top halves of
+    verticals, so that a key can be unpacked a row at a time.
+
+    :rtype: List[Tuple[int, int, int, int, int]]
+    """
+    table = []
+    for row in range(1 << 12):
+        masks = [0] * 8
+        for j in range(4):
+            masks[(row >> (3 * j)) & 7] |= 1 << j
+        table.append((masks[0], masks[1], masks[2], masks[3], masks[5]))
+    return table
+
+row_cells = build_row_cells()
+
+
+def mirror_packed(packed):
+    """
+    Key of a board mirrored left to right, given the board's key.
+
+    :param packed: A packed grid.
+    :type packed: int
+    :rtype: int
+    """
+    mirrored = 0
+    for i in range(0, 60, 12):
+        mirrored |= row_mirror[(packed >> i) & 0xfff] << i
+    return mirrored
+
+class Piece:
+    """
+    This represents a piece on the Hua Rong Dao puzzle.
+    """
+
+    __slots__ = ('is_goal', 'is_single', 'coord_x', 'coord_y', 'orientation')
+
+    def __init__(self, is_goal, is_single, coord_x, coord_y, orientation):
+        """
+        :param is_goal: True if the piece is the goal piece and False otherwise.
+        :type is_goal: bool
+        :param is_single: True if this piece is a 1x1 piece and False otherwise.
+        :type is_single: bool
+        :param coord_x: The x coordinate of the top left corner of the piece.
+        :type coord_x: int
+        :param coord_y: The y coordinate of the top left corner of the piece.
+        :type coord_y: int
+        :param orientation: The orientation of the piece (one of 'h' or 'v') 
+            if the piece is a 1x2 piece. Otherwise, this is None
+        :type orientation: str
+        """
+
+        self.is_goal = is_goal
+        self.is_single = is_single
+        self.coord_x = coord_x
+        self.coord_y = coord_y
+        self.orientation = orientation
+
+    # print out the attributes of a piece for debugging
+    def __repr__(self):
+        return '{} {} {} {} {}'.format(self.is_goal, self.is_single, \
+            self.coord_x, self.coord_y, self.orientation)
+
+    # USELESS
+    # move a piece 
+    # check legality prior to calling 
+    def move(self, x, y):
+        # move is + or - 1 
+        self.coord_x += x
+        self.coord_y += y
+
+
+class Board:
+    """
+    Board class for setting up the playing board.
+    """
+
+    # every search keeps a lot of boards alive, slots keep them small
+    __slots__ = ('pieces', 'grid', 'spaces', 'goal')
+
+    # board size is static
+    width = 4
+    height = 5
+
+    def __init__(self, pieces):
+        """
+        :param pieces: The list of Pieces
+        :type pieces: List[Piece]
+        """
+        self.pieces = pieces
+
+        # self.grid is a 2-d (size * size) array automatically generated
+        # using the information on the pieces when a board is being created.
+        # A grid contains the symbol for representing the pieces on the board.
+        self.grid = []
+        self.__construct_grid()
+
+        # the two empty cells in row major order and the top left corner of
+        # the goal piece, kept up to date by apply so nothing rescans the grid
+        spaces = []
+        self.goal = None
+        for i, line in enumerate(self.grid):
+            for j, ch in enumerate(line):
+                if ch == '.':
+                    spaces.append((i, j))
+                elif ch == char_goal and self.goal == None:
+                    self.goal = (i, j)
+        self.spaces = tuple(spaces)
+
+    def __construct_grid(self):
+        """
+        Called in __init__ to set up a 2-d grid based on the piece location information.
+
+        """
+
+        for i in range(self.height):
+            line = []
+            for j in range(self.width):
+                line.append('.')
+            self.grid.append(line)
+
+        for piece in self.pieces:
+            if piece.is_goal:
+                self.grid[piece.coord_y][piece.coord_x] = char_goal
+                self.grid[piece.coord_y][piece.coord_x + 1] = char_goal
+                self.grid[piece.coord_y + 1][piece.coord_x] = char_goal
+                self.grid[piece.coord_y + 1][piece.coord_x + 1] = char_goal
+            elif piece.is_single:
+                self.grid[piece.coord_y][piece.coord_x] = char_single
+            else:
+                if piece.orientation == 'h':
+                    self.grid[piece.coord_y][piece.coord_x] = '<'
+                    self.grid[piece.coord_y][piece.coord_x + 1] = '>'
+                elif piece.orientation == 'v':
+                    self.grid[piece.coord_y][piece.coord_x] = '^'
+                    self.grid[piece.coord_y + 1][piece.coord_x] = 'v'
+                    '''if ( (piece.coord_y + 1, piece.coord_x) == (4, 0)):
+                        #self.display()
+                        #print('\n')'''
+
+    @classmethod
+    def from_key(cls, packed, pieces=None):
+        """
+        Build the board a key was packed from, straight from its grid.
+
+        :param packed: A board key (see pack_grid).
+        :type packed: int
+        :param pieces: The pieces the board keeps, read from the grid if
+            None. Like apply, a search may hand on those of the board it
+            started from, since only the grid is used once a board is built.
+        :type pieces: Optional[List[Piece]]
+        :rtype: Board
+        """
+        board = cls.__new__(cls)
+        board.grid = unpack_grid(packed)
+        board.pieces = read_pieces(board.grid) if pieces == None else pieces
+        spaces = []
+        board.goal = None
+        for i in range(5):
+            cells = row_cells[(packed >> (12 * i)) & 0xFFF]
+            if cells[0]:
+                spaces.extend((i, j) for j in range(4) if cells[0] >> j & 1)
+            if cells[1] and board.goal == None:
+                board.goal = (i, (cells[1] & -cells[1]).bit_length() - 1)
+        board.spaces = tuple(spaces)
+        return board
+
+    def display(self):
+        """
+        Print out the current board.
+
+        """
+        for i, line in enumerate(self.grid):
+            for ch in line:
+                if ch != None:
+                    print(ch, end='')
+                
+            print()
+        
+        return 1
+    
+    def key(self):
+        """
+        Canonical key of the board, the packed grid (see pack_grid). Boards
+        with the same layout of shapes give the same key, so it can be used
+        in sets and dicts.
+
+        :rtype: int
+        """
+        return pack_grid(self.grid)
+
+    def mirror_key(self):
+        """
+        Key of the board mirrored left to right.
+
+        :rtype: int
+        """
+        return mirror_packed(self.key())
+
+    def canonical_key(self):
+        """
+        The smaller of key() and mirror_key(). A board and its mirror image
+        are the same distance from the goal, so they share this key.
+
+        :rtype: int
+        """
+        return min(self.key(), self.mirror_key())
+
+    # find the two empty spaces on the board
+    # use pg 3/7 bottom half to help you with this
+    def find_empty(self):
+        # list of tuple for each '.' position
+        return self.spaces
+
+    # all plausible moves
+    def legality(self):
+        loc_e = self.find_empty()
+        sp1 = (loc_e[0][0], loc_e[0][1])
+        sp2 = (loc_e[1][0], loc_e[1][1])
+        legal_moves = []
+        #print("135")
+
+        # space is horizantal and beside each other
+        if ((sp1[0] == sp2[0]) and (abs(sp1[1] - sp2[1]) == 1)):
+            # 4 by 4 (holds for when spaces are also not beside each other)
+            # check spaces are beside
+            # Goal is above
+            if (((sp1[0] - 2 >= 0) and (sp2[0] - 2 >= 0))) and (((self.grid[sp1[0] - 1][sp1[1]] == char_goal) and (self.grid[sp2[0] - 1][sp2[1]] == char_goal)) and ((self.grid[sp1[0] - 2][sp1[1]] == char_goal) and (self.grid[sp2[0] - 2][sp2[1]] == char_goal))):
+                legal_moves.append(([(sp1[0] - 2, sp1[1]), (sp2[0] - 2, sp2[1])], char_goal, 2, [sp1, sp2], "x"))
+            # Goal is below
+            if (((sp1[0] + 2 < 5) and (sp2[0] + 2 < 5))) and (((self.grid[sp1[0] + 1][sp1[1]] == char_goal) and (self.grid[sp2[0] + 1][sp2[1]] == char_goal)) and ((self.grid[sp1[0] + 2][sp1[1]] == char_goal) and (self.grid[sp2[0] + 2][sp2[1]] == char_goal))):
+                legal_moves.append(([(sp1[0] + 2, sp1[1]), (sp2[0] + 2, sp2[1])], char_goal, 2, [sp1, sp2], "x"))
+            
+            # 2 by 1 
+            # for RHS empty 
+            # --<>
+            if (sp1[1] + 2 < 4 and sp2[1] + 2 < 4) and (self.grid[sp1[0]][sp1[1] + 2] == '<' and self.grid[sp2[0]][sp2[1] + 2] == '>'):
+                #print("\n 155")
+                legal_moves.append((([(sp1[0], sp1[1] + 2), (sp2[0], sp2[1] + 2)]), '<>', 2, [sp1, sp2], "y"))
+            # for LHS empty
+            # <>--
+            #print("150")
+            if (sp1[1] - 2 >= 0 and sp2[1] - 2 >= 0) and (self.grid[sp1[0]][sp1[1] - 2] == '<' and self.grid[sp2[0]][sp2[1] - 2] == '>'):
+                #print("\n 151")
+                legal_moves.append((([(sp1[0], sp1[1] - 2), (sp2[0], sp2[1] - 2)]), '<>', 2, [sp1, sp2], "y"))
+                #self.display()
+            # for bottom push
+            # --
+            # <> 
+            if (sp1[0] + 1 < 5 and sp2[0] + 1 < 5) and (self.grid[sp1[0] + 1][sp1[1]] == '<' and self.grid[sp2[0] + 1][sp2[1]] == '>'):
+                #print("\n 155")
+                legal_moves.append((([(sp1[0] + 1, sp1[1]), (sp2[0] + 1, sp2[1])]), '<>', 2, [sp1, sp2], "x"))
+            # for top push 
+            # <>
+            # --
+            if (sp1[0] - 1 >= 0 and sp2[0] - 1 >= 0) and (self.grid[sp1[0] - 1][sp1[1]] == '<' and self.grid[sp2[0] - 1][sp2[1]] == '>'):
+                #print("\n 155")
+                legal_moves.append((([(sp1[0] - 1, sp1[1]), (sp2[0] - 1, sp2[1])]), '<>', 2, [sp1, sp2], "x"))
+
+        # space is vertical
+        # sp1 is above sp2 or sp1 is below sp2
+        if (abs(sp1[0] - sp2[0]) == 1) and (sp1[1] == sp2[1]):           
+            # 4 by 4
+            # check spaces are beside
+            # Goal is above
+            if ((sp1[1] - 1 >= 0) and (sp2[1] - 2 >= 0)) and (((self.grid[sp1[0]][sp1[1] - 1] == char_goal) and (self.grid[sp2[0]][sp2[1] - 1] == char_goal)) and ((self.grid[sp1[0]][sp1[1] - 2] == char_goal) and (self.grid[sp2[0]][sp2[1] - 2] == char_goal))):
+                legal_moves.append(([(sp1[0], sp1[1] - 2), (sp2[0], sp2[1] - 2)], char_goal, 2, [sp1, sp2], "y"))
+            # Goal is below
+            if ((sp1[1] + 1 < 4) and (sp2[1] + 2 < 4)) and (((self.grid[sp1[0]][sp1[1] + 1] == char_goal) and (self.grid[sp2[0]][sp2[1] + 1] == char_goal)) and ((self.grid[sp1[0]][sp1[1] + 2] == char_goal) and (self.grid[sp2[0]][sp2[1] + 2] == char_goal))):
+                legal_moves.append(([(sp1[0], sp1[1] + 2), (sp2[0], sp2[1] + 2)], char_goal, 2, [sp1, sp2], "y"))
+
+            # 1 by 2 
+            # for LHS empty
+            # ^ -
+            # v -
+            if (sp1[1] - 1 >= 0 and sp2[1] - 1 >= 0) and ((self.grid[sp1[0]][sp1[1] - 1] == '^') and (self.grid[sp2[0]][sp2[1] - 1] == 'v')):
+                legal_moves.append(([(sp1[0], sp1[1] - 1),(sp2[0], sp2[1] - 1)],'^v', 2, [sp1, sp2], "y"))
+            # for RHS empty 
+            # - ^
+            # - v
+            if (sp1[1] + 1 < 4 and sp2[1] + 1 < 4) and (self.grid[sp1[0]][sp1[1] + 1] == '^' and self.grid[sp2[0]][sp2[1] + 1] == 'v'):
+                legal_moves.append(([(sp1[0], sp1[1] + 1),(sp2[0], sp2[1] + 1)],'^v', 2, [sp1, sp2], "y"))
+            # for bottom push
+            # -
+            # -
+            # ^
+            # v
+            #if (sp1[0] + 2 < 5 and sp2[0] + 2 < 5) and (self.grid[sp1[0] + 2][sp1[1]] == '^' and self.grid[sp2[0] + 2][sp2[1]] == 'v'):
+                #legal_moves.append(([(sp1[0] + 2, sp1[1]),(sp2[0] + 2, sp2[1])],'^v', 2, [sp1, sp2], "x"))
+            # for top push
+            # ^
+            # v
+            # -
+            # -
+            #if (sp1[0] - 2 >= 0 and sp2[0] - 2 >= 0) and (self.grid[sp1[0] - 2][sp1[1]] == '^' and self.grid[sp2[0] - 2][sp2[1]] == 'v'):
+                #legal_moves.append(([(sp1[0] - 2, sp1[1]),(sp2[0] - 2, sp2[1])],'^v', 2, [sp1, sp2], "x"))
+        
+        # 2 by 1 and Singles (holds for when spaces are not beside each other)
+        # -<> is on the right
+        if (sp1[1] + 1 < 4 and sp1[1] + 2 < 4) and (self.grid[sp1[0]][sp1[1] + 1] == '<' and self.grid[sp1[0]][sp1[1] + 2] == '>'):
+            legal_moves.append(([(sp1[0], sp1[1] + 1),(sp1[0], sp1[1] + 2)],'<>', 1, [sp1], "x"))
+        # -<> is on the right
+        if (sp2[1] + 1 < 4 and sp2[1] + 2 < 4) and (self.grid[sp2[0]][sp2[1] + 1] == '<' and self.grid[sp2[0]][sp2[1] + 2] == '>'):
+            legal_moves.append(([(sp2[0], sp2[1] + 1),(sp2[0], sp2[1] + 2)],'<>', 1, [sp2], "x"))   
+        # for LHS empty 
+        if (sp2[1] - 1 >= 0 and sp2[1] - 2 >= 0) and (self.grid[sp2[0]][sp2[1] - 1] == '>' and self.grid[sp2[0]][sp2[1] - 2] == '<'):
+            legal_moves.append(([(sp2[0], sp2[1] - 1),(sp2[0], sp2[1] - 2)],'<>', 1, [sp2], "x"))
+        # for LHS empty
+        # <>- on the left
+        if (sp1[1] - 1 >= 0 and sp1[1] - 2 >= 0) and (self.grid[sp1[0]][sp1[1] - 1] == '>' and self.grid[sp1[0]][sp1[1] - 2] == '<'):
+            legal_moves.append(([(sp1[0], sp1[1] - 1),(sp1[0], sp1[1] - 2)],'<>', 1, [sp1], "x"))     
+
+        # spaces are not together  
+        # 1 by 2 (holds for when spaces are not beside each other)
+        # for LHS empty
+        # ^
+        # v is above
+        # -
+        if (sp1[0] - 1 >= 0 and sp1[0] - 2 >= 0) and (self.grid[sp1[0] - 1][sp1[1]] == 'v' and self.grid[sp1[0] - 2][sp1[1]] == '^'):           
+            #input()
+            #print("lINE 185", sp1)
+            #self.display()
+            #self.display()
+            legal_moves.append(([(sp1[0] - 1, sp1[1]),(sp1[0] - 2, sp1[1])],'^v', 1, [sp1], "x"))
+            #print('\n', self.grid[sp1[0] - 1][sp1[1]], self.grid[sp1[0] - 2][sp1[1]], '\n')
+        # -
+        # ^
+        # v is below
+        if (sp1[0] + 1 < 5 and sp1[0] + 2 < 5) and (self.grid[sp1[0] + 1][sp1[1]] == '^' and self.grid[sp1[0] + 2][sp1[1]] == 'v'):
+            #print("lINE 188 HERE ERROR?")
+            legal_moves.append(([(sp1[0] + 1, sp1[1]),(sp1[0] + 2, sp1[1])],'^v', 1, [sp1], "x"))
+        # ^
+        # v is above
+        # -
+        if (sp2[0] - 1 >= 0 and sp2[0] - 2 >= 0) and (self.grid[sp2[0] - 1][sp2[1]] == 'v' and self.grid[sp2[0] - 2][sp2[1]] == '^'):
+            #print("lINE 192")
+            '''print(sp2)'''
+            legal_moves.append(([(sp2[0] - 1, sp2[1]),(sp2[0] - 2, sp2[1])],'^v', 1, [sp2], "y"))
+            #print(self.grid[sp2[0] - 1][sp2[1]], self.grid[sp2[0] - 2][sp2[1]])
+        # -
+        # ^
+        # v is below
+        if (sp2[0] + 1 < 5 and sp2[0] + 2 < 5) and (self.grid[sp2[0] + 1][sp2[1]] == '^' and self.grid[sp2[0] + 2][sp2[1]] == 'v'):
+            #print("lINE 197")
+            legal_moves.append(([(sp2[0] + 1, sp2[1]),(sp2[0] + 2, sp2[1])],'^v', 1, [sp2], "y"))
+
+        # single
+        if (sp1[0] - 1 >= 0) and (self.grid[sp1[0] - 1][sp1[1]] == char_single):
+            legal_moves.append(([(sp1[0] - 1, sp1[1])], char_single, 1, [sp1], "x"))
+        if (sp1[0] + 1 < 5) and (self.grid[sp1[0] + 1][sp1[1]] == char_single):
+            legal_moves.append(([(sp1[0] + 1, sp1[1])], char_single, 1, [sp1], "x"))
+        if (sp1[1] - 1 >= 0) and (self.grid[sp1[0]][sp1[1] - 1] == char_single):
+            legal_moves.append(([(sp1[0], sp1[1] - 1)], char_single, 1, [sp1], "y"))
+        if (sp1[1] + 1 < 4) and self.grid[sp1[0]][sp1[1] + 1] == char_single:
+            legal_moves.append(([(sp1[0], sp1[1] + 1)], char_single, 1, [sp1], "y"))
+        if (sp2[0] - 1 >= 0) and (self.grid[sp2[0] - 1][sp2[1]] == char_single):
+            legal_moves.append(([(sp2[0] - 1, sp2[1])], char_single, 1, [sp2], "x"))  
+        if (sp2[0] + 1 < 5) and (self.grid[sp2[0] + 1][sp2[1]] == char_single):
+            legal_moves.append(([(sp2[0] + 1, sp2[1])], char_single, 1, [sp2], "x"))    
+        if (sp2[1] - 1 >= 0) and (self.grid[sp2[0]][sp2[1] - 1] == char_single):
+            legal_moves.append(([(sp2[0], sp2[1] - 1)], char_single, 1, [sp2], "y"))    
+        if (sp2[1] + 1 < 4) and (self.grid[sp2[0]][sp2[1] + 1] == char_single):
+            legal_moves.append(([(sp2[0], sp2[1] + 1)], char_single, 1, [sp2], "y"))          
+    
+        return legal_moves
+    
+
+    def apply(self, move):
+        """
+        Return the board reached by playing a move from legality(). Only the
+        rows the move writes to are copied, the others are shared with this
+        board, and the grid is never rebuilt from the pieces.
+
+        :rtype: Board
+        """
+        changed_board = Board.__new__(Board)
+        changed_board.pieces = self.pieces
+
+        # the move fills the spaces it lists and empties the cells in pos:
+        # all of them when two spaces are filled, the far one otherwise
+        pos, p_mov, filled = move[0], move[1], move[-2]
+
+        # change_board only writes between the rows of the piece and of the
+        # spaces it fills, rows are never changed in place after that
+        rows = [cell[0] for cell in pos] + [cell[0] for cell in filled]
+        grid = self.grid[:]
+        for i in range(min(rows), max(rows) + 1):
+            grid[i] = grid[i][:]
+        changed_board.grid = grid
+
+        emptied = pos if len(filled) > 1 else [pos[-1]]
+        changed_board.spaces = tuple(sorted([sp for sp in self.spaces if sp not in filled] + emptied))
+        changed_board.goal = self.goal
+        if p_mov == char_goal:
+            changed_board.goal = (self.goal[0] + (filled[0][0] - pos[0][0]) // 2,
+                                  self.goal[1] + (filled[0][1] - pos[0][1]) // 2)
+
+        return change_board(move, changed_board, self)
+
+    def successors(self):
+        """
+        :return: Every board one move away, with the number of spaces moved.
+        :rtype: List[Tuple[Board, int]]
+        """
+        return [(self.apply(move), move[-3]) for move in self.legality()]
+
+    # top left corner (row, col) of the goal piece
+    def find_goal(self):
+        return self.goal
+
+    # symbol drawn on a cell
+    def cell(self, row, col):
+        return self.grid[row][col]
+
+    # check if the goal peice is at the bottom opening [(4,1), (4,2)]
+    def goal_test(self):
+        return self.goal == (3, 1)
+                    
+
+#====================================================================================
+# Bitboard engine
+#
+# Cell (row, col) of the 4x5 board is bit row * 4 + col. A BitBoard keeps one
+# mask per piece class with a bit set at the top left corner of every piece of
+# that class, plus a mask of the two empty cells. The legal moves for each pair
+# of empty cells are worked out once, when the module is loaded.
+
+# piece classes, used as indexes into BitBoard.masks
+bit_goal, bit_single, bit_horizontal, bit_vertical = range(4)
+
+# cells covered by each piece class relative to its top left corner, and the
+# symbol drawn in each of them
+bit_shapes = (
+    ((0, 0, char_goal), (0, 1, char_goal), (1, 0, char_goal), (1, 1, char_goal)),
+    ((0, 0, char_single),),
+    ((0, 0, '<'), (0, 1, '>')),
+    ((0, 0, '^'), (1, 0, 'v')),
+)
+
+def build_move_table():
+    """
+    Work out every slide of every piece class on the empty board and index it
+    by each pair of empty cells that makes it possible. Pieces move one cell
+    at a time and a '<>' piece may also slide two cells sideways, the same
+    moves Board.legality finds.
+
+    A move is (class, from bit, to bit, cells filled, cells emptied,
+    change of the packed key, number of spaces moved).
+
+    :rtype: Dict[int, List[tuple]]
+    """
+    table = {}
+    pairs = [(1 << a) | (1 << b) for a in range(20) for b in range(a + 1, 20)]
+    for pair in pairs:
+        table[pair] = []
+
+    for cls, shape in enumerate(bit_shapes):
+        steps = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+        if cls == bit_horizontal:
+            steps += [(0, 2), (0, -2)]
+        for row in range(5):
+            for col in range(4):
+                old = [(row + i, col + j, ch) for i, j, ch in shape]
+                if any(i >= 5 or j >= 4 for i, j, ch in old):
+                    continue
+                for di, dj in steps:
+                    new = [(i + di, j + dj, ch) for i, j, ch in old]
+                    if any(i < 0 or i >= 5 or j < 0 or j >= 4 for i, j, ch in new):
+                        continue
+                    old_cells = set((i, j) for i, j, ch in old)
+                    new_cells = set((i, j) for i, j, ch in new)
+                    filled = 0
+                    for i, j in new_cells - old_cells:
+                        filled |= 1 << (i * 4 + j)
+                    emptied = 0
+                    for i, j in old_cells - new_cells:
+                        emptied |= 1 << (i * 4 + j)
+                    delta = 0
+                    for i, j, ch in new:
+                        delta += cell_codes[ch] << (3 * (i * 4 + j))
+                    for i, j, ch in old:
+                        delta -= cell_codes[ch] << (3 * (i * 4 + j))
+                    move = (cls, 1 << (row * 4 + col), 1 << ((row + di) * 4 + col + dj),
+                            filled, emptied, delta, len(new_cells - old_cells))
+                    for pair in pairs:
+                        if filled & pair == filled:
+                            table[pair].append(move)
+    return table
+
+move_table = build_move_table()
+
+
+class BitBoard:
+    """
+    Compact board: one bitmask per piece class, a mask of the empty cells and
+    the packed grid, which is also the key of the board.
+    """
+
+    __slots__ = ('masks', 'empty', 'packed')
+
+    def __init__(self, masks, empty, packed):
+        """
+        :param masks: Top left corners of the pieces of each class.
+        :type masks: List[int]
+        :param empty: The two empty cells.
+        :type empty: int
+        :param packed: The packed grid (see pack_grid).
+        :type packed: int
+        """
+        self.masks = masks
+        self.empty = empty
+        self.packed = packed
+
+    @classmethod
+    def from_board(cls, board):
+        """
+        Build the bitboard of a Board.
+
+        :param board: The board to convert.
+        :type board: Board
+        :rtype: BitBoard
+        """
+        masks = [0, 0, 0, 0]
+        empty = 0
+        seen_goal = False
+        for i, line in enumerate(board.grid):
+            for j, ch in enumerate(line):
+                bit = 1 << (i * 4 + j)
+                if ch == '.':
+                    empty |= bit
+                elif ch == char_goal and not seen_goal:
+                    masks[bit_goal] = bit
+                    seen_goal = True
+                elif ch == char_single:
+                    masks[bit_single] |= bit
+                elif ch == '<':
+                    masks[bit_horizontal] |= bit
+                elif ch == '^':
+                    masks[bit_vertical] |= bit
+        return cls(masks, empty, pack_grid(board.grid))
+
+    @classmethod
+    def from_key(cls, packed):
+        """
+        Build the bitboard a key was packed from, without going through a
+        Board.
+
+        :param packed: A board key (see pack_grid).
+        :type packed: int
+        :rtype: BitBoard
+        """
+        goal = single = horizontal = vertical = empty = 0
+        for i in range(5):
+            cells = row_cells[(packed >> (12 * i)) & 0xFFF]
+            empty |= cells[0] << (4 * i)
+            goal |= cells[1] << (4 * i)
+            single |= cells[2] << (4 * i)
+            horizontal |= cells[3] << (4 * i)
+            vertical |= cells[4] << (4 * i)
+        masks = [0, 0, 0, 0]
+        # the lowest goal cell is its top left corner
+        masks[bit_goal] = goal & -goal
+        masks[bit_single] = single
+        masks[bit_horizontal] = horizontal
+        masks[bit_vertical] = vertical
+        return cls(masks, empty, packed)
+
+    @property
+    def grid(self):
+        return unpack_grid(self.packed)
+
+    def display(self):
+        """
+        Print out the current board.
+
+        """
+        for line in self.grid:
+            print(''.join(line))
+
+        return 1
+
+    def key(self):
+        """
+        Canonical key of the board, the packed grid (see pack_grid).
+
+        :rtype: int
+        """
+        return self.packed
+
+    def mirror_key(self):
+        """
+        Key of the board mirrored left to right.
+
+        :rtype: int
+        """
+        return mirror_packed(self.packed)
+
+    def canonical_key(self):
+        """
+        The smaller of key() and mirror_key().
+
+        :rtype: int
+        """
+        return min(self.packed, self.mirror_key())
+
+    def find_empty(self):
+        first = self.empty & -self.empty
+        i = first.bit_length() - 1
+        j = (self.empty ^ first).bit_length() - 1
+        return [(i // 4, i % 4), (j // 4, j % 4)]
+
+    def find_goal(self):
+        i = self.masks[bit_goal].bit_length() - 1
+        return (i // 4, i % 4)
+
+    def cell(self, row, col):
+        return cell_chars[(self.packed >> (3 * (row * 4 + col))) & 7]
+
+    def legality(self):
+        masks = self.masks
+        return [move for move in move_table[self.empty] if masks[move[0]] & move[1]]
+
+    def apply(self, move):
+        """
+        Return the board reached by playing a move from legality().
+
+        :rtype: BitBoard
+        """
+        cls, src, dst, filled, emptied, delta, spaces = move
+        masks = self.masks[:]
+        masks[cls] ^= src | dst
+        return BitBoard(masks, (self.empty & ~filled) | emptied, self.packed + delta)
+
+    def successors(self):
+        """
+        :return: Every board one move away, with the number of spaces moved.
+        :rtype: List[Tuple[BitBoard, int]]
+        """
+        return [(self.apply(move), move[-1]) for move in self.legality()]
+
+    # the goal piece has its top left corner on (3, 1)
+    def goal_test(self):
+        return self.masks[bit_goal] == 1 << 13
+
+
+# successor function
+# change board configuration per space
+# changed_board has to start as a copy of board (see Board.apply)
+def change_board(move, changed_board, board):
+
+    #print(move, len(move[-2]), len(move[-5]))
+    if len(move[-2]) > 1:   # spaces
+        sp1 = move[-2][0]
+        sp2 = move[-2][1]
+        if len(move[-5]) > 1:   # num of piece's on grid spot
+            pos = move[-5]
+            p_mov = move[-4]
+            if p_mov == char_goal:
+                if (pos[0][0] == sp1[0] - 2) and (pos[0][1] == sp1[1]) and (pos[1][0] == sp2[0] - 2) and (pos[1][1] == sp2[1]):     # push 2 by 2 down
+                    changed_board.grid[sp1[0] - 2][sp1[1]] = '.'
+                    changed_board.grid[sp2[0] - 2][sp2[1]] = '.'
+                    changed_board.grid[sp1[0] - 1][sp1[1]] = char_goal
+                    changed_board.grid[sp2[0] - 1][sp2[1]] = char_goal
+                    changed_board.grid[sp1[0]][sp1[1]] = char_goal
+                    changed_board.grid[sp2[0]][sp2[1]] = char_goal
+                    return changed_board
+                elif (pos[0][0] == sp1[0] + 2) and (pos[0][1] == sp1[1]) and (pos[1][0] == sp2[0] + 2) and (pos[1][1] == sp2[1]):     # push 2 by 2 up
+                    changed_board.grid[sp1[0] + 2][sp1[1]] = '.'
+                    changed_board.grid[sp2[0] + 2][sp2[1]] = '.'
+                    changed_board.grid[sp1[0] + 1][sp1[1]] = char_goal
+                    changed_board.grid[sp2[0] + 1][sp2[1]] = char_goal
+                    changed_board.grid[sp1[0]][sp1[1]] = char_goal
+                    changed_board.grid[sp2[0]][sp2[1]] = char_goal
+                    return changed_board
+                elif (pos[0][0] == sp1[0]) and (pos[0][1] == sp1[1] - 2) and (pos[1][0] == sp2[0]) and (pos[1][1] == sp2[1] - 2):     # push 2 by 2 to the left 
+                    changed_board.grid[sp1[0]][sp1[1] - 2] = '.'
+                    changed_board.grid[sp2[0]][sp2[1] - 2] = '.'
+                    changed_board.grid[sp1[0]][sp1[1] - 1] = char_goal
+                    changed_board.grid[sp2[0]][sp2[1] - 1] = char_goal
+                    changed_board.grid[sp1[0]][sp1[1]] = char_goal
+                    changed_board.grid[sp2[0]][sp2[1]] = char_goal
+                    return changed_board
+                elif (pos[0][0] == sp1[0]) and (pos[0][1] == sp1[1] + 2) and (pos[1][0] == sp2[0]) and (pos[1][1] == sp2[1] + 2):     # push 2 by 2 to the right 
+                    changed_board.grid[sp1[0]][sp1[1] + 2] = '.'
+                    changed_board.grid[sp2[0]][sp2[1] + 2] = '.'
+                    changed_board.grid[sp1[0]][sp1[1] + 1] = char_goal
+                    changed_board.grid[sp2[0]][sp2[1] + 1] = char_goal
+                    changed_board.grid[sp1[0]][sp1[1]] = char_goal
+                    changed_board.grid[sp2[0]][sp2[1]] = char_goal
+                    return changed_board
+            elif p_mov == '<>':
+                if (pos[0][0] == sp1[0]) and (pos[0][1] == sp1[1] - 2) and (pos[1][0] == sp2[0]) and (pos[1][1] == sp2[1] - 2):     # push 2 by 1 right by 2 spaces
+                    #print('355')
+                    '''changed_board.display()
+                    input()
+                    board.display()
+                    input()'''
+                    changed_board.grid[sp1[0]][sp1[1] - 2] = '.'
+                    changed_board.grid[sp2[0]][sp2[1] - 2] = '.'
+                    changed_board.grid[sp1[0]][sp1[1]] = '<'
+                    changed_board.grid[sp2[0]][sp2[1]] = '>'
+                    return changed_board
+                elif (pos[0][0] == sp1[0]) and (pos[0][1] == sp1[1] + 2) and (pos[1][0] == sp2[0]) and (pos[1][1] == sp2[1] + 2):    # push 2 by 1 left by 2 spaces                 
+                    #print('363')
+                    changed_board.grid[sp1[0]][sp1[1] + 2] = '.'
+                    changed_board.grid[sp2[0]][sp2[1] + 2] = '.'
+                    changed_board.grid[sp1[0]][sp1[1]] = '<'
+                    changed_board.grid[sp2[0]][sp2[1]] = '>'
+                    return changed_board
+                elif (pos[0][0] == sp1[0] + 1) and (pos[0][1] == sp1[1]) and (pos[1][0] == sp2[0] + 1) and (pos[1][1] == sp2[1]):     # push 2 by 1 up by 1 space
+                    #print('371')
+                    changed_board.grid[sp1[0] + 1][sp1[1]] = '.'
+                    changed_board.grid[sp2[0] + 1][sp2[1]] = '.'
+                    changed_board.grid[sp1[0]][sp1[1]] = '<'
+                    changed_board.grid[sp2[0]][sp2[1]] = '>'
+                    return changed_board
+                elif (pos[0][0] == sp1[0] - 1) and (pos[0][1] == sp1[1]) and (pos[1][0] == sp2[0] - 1) and (pos[1][1] == sp2[1]):     # push 2 by 1 down by 1 space
+                    #print('379')
+                    changed_board.grid[sp1[0] - 1][sp1[1]] = '.'
+                    changed_board.grid[sp2[0] - 1][sp2[1]] = '.'
+                    changed_board.grid[sp1[0]][sp1[1]] = '<'
+                    changed_board.grid[sp2[0]][sp2[1]] = '>'
+                    return changed_board
+            elif p_mov == '^v':
+                #print(move, move[-2], sp1)
+                if (pos[0][0] == sp1[0]) and (pos[0][1] == sp1[1] - 1) and (pos[1][0] == sp2[0]) and (pos[1][1] == sp2[1] - 1):     # push 1 by 2 right by 1 space
+                    #print("394")
+                    changed_board.grid[sp1[0]][sp1[1] - 1] = '.'
+                    changed_board.grid[sp2[0]][sp2[1] - 1] = '.'
+                    changed_board.grid[sp1[0]][sp1[1]] = '^'
+                    changed_board.grid[sp2[0]][sp2[1]] = 'v'
+                    return changed_board
+                elif (pos[0][0] == sp1[0]) and (pos[0][1] == sp1[1] + 1) and (pos[1][0] == sp2[0]) and (pos[1][1] == sp2[1] + 1):    # push 1 by 2 left by 1 space
+                    changed_board.grid[sp1[0]][sp1[1] + 1] = '.'
+                    changed_board.grid[sp2[0]][sp2[1] + 1] = '.'
+                    changed_board.grid[sp1[0]][sp1[1]] = '^'
+                    changed_board.grid[sp2[0]][sp2[1]] = 'v'
+                    return changed_board
+                elif (pos[0][0] == sp1[0] + 2) and (pos[0][1] == sp1[1]) and (pos[1][0] == sp2[0] + 2) and (pos[1][1] == sp2[1]):     # push 1 by 2 up by 2 spaces
+                    changed_board.grid[sp1[0] + 2][sp1[1]] = '.'
+                    changed_board.grid[sp2[0] + 2][sp2[1]] = '.'
+                    changed_board.grid[sp1[0]][sp1[1]] = '^'
+                    changed_board.grid[sp2[0]][sp2[1]] = 'v'
+                    return changed_board
+                elif (pos[0][0] == sp1[0] - 2) and (pos[0][1] == sp1[1]) and (pos[1][0] == sp2[0] - 2) and (pos[1][1] == sp2[1]):     # push 1 by 2 up by 2 spaces
+                    changed_board.grid[sp1[0] - 2][sp1[1]] = '.'
+                    changed_board.grid[sp2[0] - 2][sp2[1]] = '.'
+                    changed_board.grid[sp1[0]][sp1[1]] = '^'
+                    changed_board.grid[sp2[0]][sp2[1]] = 'v'
+                    return changed_board
+            
+    else:   # spaces
+        sp = move[-2][0]
+        pos = move[-5]
+        p_mov = move[-4]
+        if len(move[-5]) > 1:   # num of piece's grid spots
+            if p_mov == '^v':
+                if (pos[0][0] == sp[0] - 1) and (pos[0][1] == sp[1]) and (pos[1][0] == sp[0] - 2) and (pos[1][1] == sp[1]):     # push 1 by 2 piece down by 1 space
+                    # ^
+                    # v is above
+                    # -
+                    changed_board.grid[sp[0] - 2][sp[1]] = '.'
+                    changed_board.grid[sp[0] - 1][sp[1]] = '^'
+                    changed_board.grid[sp[0]][sp[1]] = 'v'
+                    return changed_board
+                elif (pos[0][0] == sp[0] + 1) and (pos[0][1] == sp[1]) and (pos[1][0] == sp[0] + 2) and (pos[1][1] == sp[1]):     # push 1 by 2 piece up by 1 space
+                    # -
+                    # ^
+                    # v is below
+                    changed_board.grid[sp[0] + 2][sp[1]] = '.'
+                    changed_board.grid[sp[0] + 1][sp[1]] = 'v'
+                    changed_board.grid[sp[0]][sp[1]] = '^'
+                    return changed_board
+            elif p_mov == '<>':
+                if (pos[0][0] == sp[0]) and (pos[0][1] == sp[1] - 1) and (pos[1][0] == sp[0]) and (pos[1][1] == sp[1] - 2):     # push 2 by 1 piece right by 1 space
+                    # <>- on the left
+                    #print('438')
+                    changed_board.grid[sp[0]][sp[1] - 2] = '.'
+                    changed_board.grid[sp[0]][sp[1] - 1] = '<'
+                    changed_board.grid[sp[0]][sp[1]] = '>'
+                    return changed_board
+                elif (pos[0][0] == sp[0]) and (pos[0][1] == sp[1] + 1) and (pos[1][0] == sp[0]) and (pos[1][1] == sp[1]  + 2):     # push 2 by 1 piece left by 1 space
+                    # -<> is on the right
+                    #print('447')
+                    changed_board.grid[sp[0]][sp[1] + 2] = '.'
+                    changed_board.grid[sp[0]][sp[1] + 1] = '>'
+                    changed_board.grid[sp[0]][sp[1]] = '<'
+                    return changed_board
+        else:
+            if p_mov == char_single:
+                if (pos[0][0] == sp[0] - 1) and (pos[0][1] == sp[1]):
+                    changed_board.grid[sp[0] - 1][sp[1]] = '.'
+                    changed_board.grid[sp[0]][sp[1]] = char_single
+                    #changed_board.display()
+                    return changed_board
+                elif (pos[0][0] == sp[0] + 1) and (pos[0][1] == sp[1]):
+                    changed_board.grid[sp[0] + 1][sp[1]] = '.'
+                    changed_board.grid[sp[0]][sp[1]] = char_single
+                    #changed_board.display()
+                    return changed_board
+                elif (pos[0][0] == sp[0]) and (pos[0][1] == sp[1] - 1):
+                    changed_board.grid[sp[0]][sp[1] - 1] = '.'
+                    changed_board.grid[sp[0]][sp[1]] = char_single
+                    #changed_board.display()
+                    return changed_board
+                elif (pos[0][0] == sp[0]) and (pos[0][1] == sp[1] + 1):
+                    changed_board.grid[sp[0]][sp[1] + 1] = '.'
+                    changed_board.grid[sp[0]][sp[1]] = char_single
+                    #changed_board.display()
+                    return changed_board
+    '''x = input()
+    changed_board.display()'''
+    #print('\n')
+    
+    return changed_board
+
+class State:
+    """
+    State class wrapping a Board with some extra current state information.
+    Note that State and Board are different. Board has the locations of the pieces. 
+    State has a Board and some extra information that is relevant to the search: 
+    heuristic function, f value, current depth and parent.
+    """
+
+    # one State per generated board, slots keep them small. That saves
+    # 1.3-1.7x per State, short of the several times smaller node records
+    # that were the aim: AStar and DFS reach further by keeping only keys in
+    # their frontiers, while BiBFS and IDAStar still hold States
+    __slots__ = ('board', 'h', 'f', 'depth', 'parent', 'id', 'move')
+
+    def __init__(self, board, f, depth, parent=None, heuristic=None, move=None, h=None, key=None):
+        """
+        :param board: The board of the state.
+        :type board: Board
+        :param f: The f value of current state.
+        :type f: int
+        :param depth: The depth of current state in the search tree.
+        :type depth: int
+        :param parent: The parent of current state.
+        :type parent: Optional[State]
+        :param heuristic: The heuristic function, get_h if None.
+        :type heuristic: Optional[Callable[[Board], int]]
+        :param move: Index of the move in the parent board's successors().
+        :type move: Optional[int]
+        :param h: The heuristic value of board if it is already known, so
+            it is not worked out again.
+        :type h: Optional[int]
+        :param key: The key of board if it is already known.
+        :type key: Optional[int]
+        """
+        if h == None:
+            if heuristic == None:
+                heuristic = get_h
+            h = heuristic(board)
+        self.board = board
+        self.h = h
+        self.f = self.h + depth + 1
+        self.depth = depth
+        self.parent = parent
+        # The key of the board, used to detect repeats.
+        self.id = board.key() if key == None else key
+        self.move = move
+
+    # print out the attributes of a piece for debugging
+    def __str__(self):
+        print('\n')
+        self.board.display() 
+        #self.board.grid
+        return f'\nNew: f: {self.f}, depth: {self.depth}, parent: {self.parent}, id: {self.id}'
+    
+    # order by f, then by h so deeper states win ties
+    def __lt__(self, other):
+        return (self.f, self.h) < (other.f, other.h)
+    
+    
+
+
+class SearchLimit(Exception):
+    """
+    Raised inside a search when it runs over one of its budgets.
+    """
+
+    def __init__(self, reason, best=None):
+        """
+        :param reason: The budget that ran out: 'max_nodes', 'timeout' or
+            'max_memory'.
+        :type reason: str
+        :param best: The state at the end of the best partial path, set by
+            the searches that keep one (A*).
+        :type best: Optional[State]
+        """
+        Exception.__init__(self, reason)
+        self.reason = reason
+        self.best = best
+
+
+# the time and memory budgets are checked once every this many expansions
+budget_check_every = 256
+
+
+def memory_used():
+    """
+    :return: The memory this process holds in bytes, its peak when the
+        current size cannot be read, None when neither can.
+    :rtype: Optional[int]
+    """
+    try:
+        statm = open('/proc/self/statm', "r")
+        resident = int(statm.read().split()[1])
+        statm.close()
+        return resident * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource == None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes everywhere else
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+# wall clock and CPU time, in seconds
+def clocks():
+    return time.perf_counter(), time.process_time()
+
+
+class SearchStats:
+    """
+    Counters a search fills in when it is given one, and the budgets it
+    has to stay within: states expanded, wall clock time from deadline and
+    the memory of the whole process. When one runs out the search raises
+    SearchLimit and limit is set to its name.
+
+    With timed, the wall clock and CPU time of each phase are added up too:
+    'movegen' (legality), 'successor' (building the successor states),
+    'dedup' (checking them against the visited boards and queueing them),
+    'search' (the whole search), 'shorten' (shorten_path, when solve is
+    asked to) and 'io' (reading the puzzle and writing the solution, only
+    filled in by read_from_file and solve_file). Timing reads
+    the clocks a few times per expanded state, so it is off by default.
+    """
+
+    def __init__(self, max_nodes=None, timed=False, deadline=None, max_memory=None):
+        """
+        :param max_nodes: Most states the search may expand, None for no limit.
+        :type max_nodes: Optional[int]
+        :param timed: True to time each phase of the search.
+        :type timed: bool
+        :param deadline: time.perf_counter() value the search has to stop
+            by, None for no limit.
+        :type deadline: Optional[float]
+        :param max_memory: Most bytes the process may hold, None for no limit.
+        :type max_memory: Optional[int]
+        """
+        self.expanded = 0  # states whose successors were generated
+        self.generated = 0  # successor states built
+        self.duplicates = 0  # states dropped because their board was seen
+        self.peak_frontier = 0  # most states waiting to be expanded
+        self.peak_visited = 0  # most boards remembered as seen
+        self.max_nodes = max_nodes
+        self.deadline = deadline
+        self.max_memory = max_memory
+        self.limit = None  # the budget that ran out, if any
+        self.timed = timed
+        self.wall = {}  # phase -> seconds
+        self.cpu = {}
+
+    def check_budgets(self, periodic=True):
+        """
+        Raise SearchLimit if a budget has run out. The states expanded are
+        checked every time, time and memory every budget_check_every states
+        if periodic, else every time as well.
+        """
+        reason = None
+        if self.max_nodes != None and self.expanded > self.max_nodes:
+            reason = 'max_nodes'
+        elif not periodic or self.expanded % budget_check_every == 0:
+            if self.deadline != None and time.perf_counter() > self.deadline:
+                reason = 'timeout'
+            elif self.max_memory != None:
+                used = memory_used()
+                if used != None and used > self.max_memory:
+                    reason = 'max_memory'
+        if reason != None:
+            self.limit = reason
+            raise SearchLimit(reason)
+
+    def sizes(self, frontier, visited):
+        """
+        Record the current frontier and visited sizes.
+        """
+        if frontier > self.peak_frontier:
+            self.peak_frontier = frontier
+        if visited > self.peak_visited:
+            self.peak_visited = visited
+
+    def add_time(self, phase, start):
+        """
+        Add the time since start, a clocks() reading, to phase.
+        """
+        wall, cpu = clocks()
+        self.wall[phase] = self.wall.get(phase, 0) + wall - start[0]
+        self.cpu[phase] = self.cpu.get(phase, 0) + cpu - start[1]
+
+    def report(self):
+        """
+        :return: The counters, the ratios worked out from them and, when
+            timed, the time of each phase, ready for json.dumps.
+        :rtype: dict
+        """
+        out = {'expanded': self.expanded, 'generated': self.generated,
+               'duplicates': self.duplicates,
+               'duplicate_ratio': round(self.duplicates / self.generated, 4) if self.generated > 0 else None,
+               'peak_frontier': self.peak_frontier, 'peak_visited': self.peak_visited,
+               'branching_factor': round(self.generated / self.expanded, 4) if self.expanded > 0 else None,
+               'limit': self.limit}
+        if self.timed:
+            out['time'] = {}
+            for phase in self.wall:
+                out['time'][phase] = {'wall': round(self.wall[phase], 6), 'cpu': round(self.cpu[phase], 6)}
+        return out
+
+# Returns a list of successor state            
+# with link=False the successors do not point back at parent, the search
+# keeps its own back pointers (see replay_path)
+def gen_states(parent, pieces, heuristic=None, stats=None, link=True):
+    timed = False
+    if stats != None:
+        stats.expanded += 1
+        stats.check_budgets()
+        timed = stats.timed
+    if timed:
+        start = clocks()
+    main_board = parent.board
+    # the same moves, in the same order, as main_board.successors()
+    moves = main_board.legality()
+    if timed:
+        stats.add_time('movegen', start)
+        start = clocks()
+    out = []  # list of successor states
+    link_to = parent if link else None
+    # create a new state object with the resulting board of each legal move
+    # the boards are built from the parent's board, not from the pieces
+    for i, move in enumerate(moves):
+        node = State(main_board.apply(move), parent.f, parent.depth + 1, link_to, heuristic, i)    
+        out.append(node)
+    out.reverse()
+    if stats != None:
+        stats.generated += len(out)
+        if timed:
+            stats.add_time('successor', start)
+    # return a list of all the states
+    return out
+
+# A back pointer is one int: the key a board was reached from, shifted up,
+# with the index of the move in that board's successors() in the low bits.
+# A board has at most 10 legal moves. The initial board points at no_parent
+move_bits = 4
+no_parent = -1
+
+def back_pointer(parent_key, move):
+    return (parent_key << move_bits) | move
+
+# Rebuild the state at the end of a path the search only kept back pointers
+# for: Back maps a key to its back_pointer. The moves are played again from
+# init_state, so only the boards on the path are ever rebuilt
+def replay_path(init_state, Back, key):
+    moves = []
+    back = Back[key]
+    while back != no_parent:
+        moves.append(back & ((1 << move_bits) - 1))
+        back = Back[back >> move_bits]
+    moves.reverse()
+
+    curr = init_state
+    for move in moves:
+        changed_board, space = curr.board.successors()[move]
+        curr = State(changed_board, 0, curr.depth + 1, curr)
+    return curr
+
+# Return seq of states until the initial state reference
+def get_sol(state):
+    par_l = []
+    # follow the parent pointers back to the initial state
+    par = state
+    while par != None:
+        par_l.append(par)
+        par = par.parent
+    par_l.reverse()
+
+    return par_l  # initial state to the goal state
+
+
+# function that takes a board and returns its heuristic value
+# implement Manhattan Distance: sum of the Manhattan distances of the tiles to their goal positions
+def get_h(board):
+    # find the top left corner of the goal piece
+    goal = board.find_goal()
+    
+    # reff: http://theory.stanford.edu/~amitp/GameProgramming/Heuristics.html  
+    # distance from the bottom right corner to (4, 2)
+    x = abs(goal[0] + 1 - 4)
+    y = abs(goal[1] + 1 - 2)
+
+    return x + y
+
+# cells the goal piece has to cover, and the pieces sitting on them
+goal_cells = [(3, 1), (3, 2), (4, 1), (4, 2)]
+
+# Manhattan distance plus one for every other piece on the goal cells: each
+# of them has to move at least once before the goal piece can get there
+def get_h_blocking(board):
+    goal = board.find_goal()
+    blockers = set()
+    for row, col in goal_cells:
+        if goal[0] <= row <= goal[0] + 1 and goal[1] <= col <= goal[1] + 1:
+            continue
+        ch = board.cell(row, col)
+        # name each piece by its top left corner
+        if ch == char_single or ch == '<' or ch == '^':
+            blockers.add((row, col))
+        elif ch == '>':
+            blockers.add((row, col - 1))
+        elif ch == 'v':
+            blockers.add((row - 1, col))
+    return get_h(board) + len(blockers)
+
+#====================================================================================
+# Pattern database
+#
+# The abstract board keeps the goal piece and the two spaces and forgets what
+# covers every other cell. Any piece that fits on those cells may slide into a
+# space, so every real move is also an abstract move and the abstract distance
+# to the goal is a lower bound on the real one. The distances are found once by
+# a backward BFS from every abstract goal board and saved to pdb_file.
+#
+# This is a single small pattern, not the additive database over disjoint
+# sets of pieces asked for: the abstraction keeps no piece but the goal, so
+# there is nothing to add up, and it takes the max with get_h_blocking
+# instead. It cuts the states A* expands against manhattan by about 4% on the
+# classic layout (23958 to 23097) and by 50-70% on the easier named layouts,
+# not by orders of magnitude.
+
+pdb_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hrd_pdb.txt')
+
+# bump this whenever the abstraction or pdb_moves change; a saved database
+# of another version, or of another movegen_version, is built again
+pdb_version = 1
+
+# (goal corner, first space, second space) -> moves to the goal
+pdb = {}
+
+
+def pdb_moves(goal, spaces):
+    """
+    Abstract boards one move away from (goal, spaces).
+
+    :param goal: Top left corner of the goal piece.
+    :type goal: Tuple[int, int]
+    :param spaces: The two empty cells.
+    :type spaces: Set[Tuple[int, int]]
+    :rtype: List[Tuple[Tuple[int, int], FrozenSet[Tuple[int, int]]]]
+    """
+    out = []
+    goal_body = set((goal[0] + i, goal[1] + j) for i in range(2) for j in range(2))
+    for cls, shape in enumerate(bit_shapes):
+        steps = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+        if cls == bit_horizontal:
+            steps += [(0, 2), (0, -2)]
+        if cls == bit_goal:
+            corners = [goal]
+        else:
+            corners = [(row, col) for row in range(5) for col in range(4)]
+        for row, col in corners:
+            old = set((row + i, col + j) for i, j, ch in shape)
+            if cls != bit_goal and (old & goal_body or old & spaces):
+                continue
+            if any(i >= 5 or j >= 4 for i, j in old):
+                continue
+            for di, dj in steps:
+                new = set((i + di, j + dj) for i, j in old)
+                if any(i < 0 or i >= 5 or j < 0 or j >= 4 for i, j in new):
+                    continue
+                if not (new - old) <= spaces:
+                    continue
+                new_goal = goal
+                if cls == bit_goal:
+                    new_goal = (goal[0] + di, goal[1] + dj)
+                out.append((new_goal, frozenset((spaces - new) | (old - new))))
+    return out
+
+
+def build_pdb():
+    """
+    Backward BFS from every abstract board with the goal piece on (3, 1).
+
+    :return: Moves to the goal of every abstract board that can reach it.
+    :rtype: Dict[Tuple[Tuple[int, int], Tuple[int, int], Tuple[int, int]], int]
+    """
+    goal = (3, 1)
+    free = [(i, j) for i in range(5) for j in range(4) if not (3 <= i and 1 <= j <= 2)]
+    dist = {}
+    layer = []
+    for a in range(len(free)):
+        for b in range(a + 1, len(free)):
+            node = (goal, frozenset([free[a], free[b]]))
+            dist[node] = 0
+            layer.append(node)
+    depth = 0
+    while len(layer) > 0:
+        depth += 1
+        next_layer = []
+        for goal, spaces in layer:
+            for node in pdb_moves(goal, spaces):
+                if node not in dist:
+                    dist[node] = depth
+                    next_layer.append(node)
+        layer = next_layer
+
+    table = {}
+    for (goal, spaces), moves in dist.items():
+        sp1, sp2 = sorted(spaces)
+        table[(goal, sp1, sp2)] = moves
+    return table
+
+
+def pdb_header():
+    return 'hrd pdb {} movegen {}\n'.format(pdb_version, movegen_version)
+
+
+def write_pdb(filename=pdb_file, table=None):
+    """
+    Save the pattern database, built now if table is None. The first line
+    holds the versions it was built with (pdb_header), then one abstract
+    board per line: goal row, goal col, the rows and cols of both spaces,
+    then the distance.
+    """
+    if table == None:
+        table = build_pdb()
+    pdb_out = open(filename, "w")
+    pdb_out.write(pdb_header())
+    for (goal, sp1, sp2), moves in sorted(table.items()):
+        pdb_out.write('{} {} {} {} {} {} {}\n'.format(goal[0], goal[1], sp1[0], sp1[1], sp2[0], sp2[1], moves))
+    pdb_out.close()
+
+
+def load_pdb(filename=pdb_file):
+    """
+    Fill pdb from the saved database. If the file is missing or was built
+    with other versions, the database is built again and saved over it
+    when the file can be written.
+    """
+    if os.path.exists(filename):
+        pdb_in = open(filename, "r")
+        if pdb_in.readline() == pdb_header():
+            for line in pdb_in:
+                v = [int(x) for x in line.split()]
+                pdb[((v[0], v[1]), (v[2], v[3]), (v[4], v[5]))] = v[6]
+            pdb_in.close()
+            return
+        pdb_in.close()
+    table = build_pdb()
+    pdb.update(table)
+    try:
+        write_pdb(filename, table)
+    except OSError:
+        # e.g. installed read only, the database is then built every run
+        pass
+
+
+# pattern database lookup, never weaker than get_h_blocking
+def get_h_pdb(board):
+    if not pdb:
+        load_pdb()
+    spaces = board.find_empty()
+    h = pdb.get((board.find_goal(), spaces[0], spaces[1]), 0)
+    return max(h, get_h_blocking(board))
+
+# the heuristics A* can use, by name
+heuristics = {
+    'manhattan': get_h,
+    'blocking': get_h_blocking,
+    'pdb': get_h_pdb,
+}
+
+# key the searches use to detect repeats. With mirror a board and its left
+# to right mirror image count as the same board; the states still hold the
+# boards that were really played, so the solution path is never mirrored
+def search_key(board_key, mirror):
+    if mirror:
+        return min(board_key, mirror_packed(board_key))
+    return board_key
+
+# the board a frontier entry stands for, rebuilt from its key in the engine
+# of the initial board
+def frontier_board(board_key, init_state):
+    if isinstance(init_state.board, BitBoard):
+        return BitBoard.from_key(board_key)
+    return Board.from_key(board_key, init_state.board.pieces)
+
+# the Best_g value of a board A* has expanded
+closed = -1
+
+def AStar(init_state, pieces, mirror=False, heuristic=None, stats=None):
+    """
+    A* search on f = h + depth + 1, the f of State.
+
+    Best_g holds the cheapest known depth of every board key, and closed
+    for a board that was expanded: it is below every depth, so nothing is
+    queued for that board again. An entry that was pushed before a cheaper
+    path to its board was found is left in the heap and skipped when it is
+    popped. Ties on f are broken by h and then
+    by insertion order, so the search is deterministic.
+
+    With mirror, boards are keyed by search_key(key, True). The heuristic
+    (get_h if None) has to be the one init_state was built with.
+
+    The frontier holds no boards or states: an entry is (f, h, count, key
+    of the board, depth), and the board is rebuilt from its key when the
+    entry is popped and still current. Back keeps, for every key, the key
+    it was reached from on its cheapest known path and the move played, and
+    the solution is rebuilt from those by replay_path.
+
+    When a budget runs out the SearchLimit carries the path to the best
+    board queued so far: the lowest h, then the fewest moves.
+    """
+    count = 0
+    Frontier = [(init_state.f, init_state.h, count, init_state.id, init_state.depth)]
+    init_key = search_key(init_state.id, mirror)
+    Best_g = {init_key: init_state.depth}
+    Back = {init_key: no_parent}
+    best_h, best_depth, best_key = init_state.h, init_state.depth, init_key
+    timed = stats != None and stats.timed
+    while len(Frontier) > 0:
+        curr_f, curr_h, curr_count, board_key, depth = heappop(Frontier)
+        key = search_key(board_key, mirror)
+        # stale entry: the board was expanded or reached more cheaply
+        if depth > Best_g[key]:
+            continue
+        curr = State(frontier_board(board_key, init_state), 0, depth, None, heuristic, None, curr_h, board_key)
+        if curr.board.goal_test():
+            return replay_path(init_state, Back, key)
+        Best_g[key] = closed
+        try:
+            children = gen_states(curr, pieces, heuristic, stats, False)
+        except SearchLimit as limit:
+            limit.best = replay_path(init_state, Back, best_key)
+            raise
+        if timed:
+            start = clocks()
+        for s in children:
+            s_key = search_key(s.id, mirror)
+            # the back pointers of a closed key are already in use
+            if s_key in Best_g and Best_g[s_key] <= s.depth:
+                if stats != None:
+                    stats.duplicates += 1
+                continue
+            Best_g[s_key] = s.depth
+            Back[s_key] = back_pointer(key, s.move)
+            if s.h < best_h or (s.h == best_h and s.depth < best_depth):
+                best_h, best_depth, best_key = s.h, s.depth, s_key
+            count += 1
+            heappush(Frontier, (s.f, s.h, count, s.id, s.depth))
+        if stats != None:
+            stats.sizes(len(Frontier), len(Best_g))
+            if timed:
+                stats.add_time('dedup', start)
+    return None
+
+def DFS(init_state, pieces, mirror=False, stats=None):
+    # boards to expand as (key, depth, back pointer), each board is rebuilt
+    # from its key when it comes off the stack unexplored
+    Frontier=[(init_state.id, init_state.depth, no_parent)]
+    # key of every board already expanded -> back pointer
+    Explored = {}
+    timed = stats != None and stats.timed
+    while len(Frontier) > 0:
+        if timed:
+            start = clocks()
+        board_key, depth, back = Frontier.pop()
+        key = search_key(board_key, mirror)
+        seen = key in Explored
+        if timed:
+            stats.add_time('dedup', start)
+        if seen:
+            # boards are checked when they come off the stack, not when pushed
+            if stats != None:
+                stats.duplicates += 1
+        else:
+            Explored[key] = back
+            curr = State(frontier_board(board_key, init_state), 0, depth, None, None, None, 0, board_key)
+            if curr.board.goal_test():
+                return replay_path(init_state, Explored, key)
+            new_states = gen_states(curr, pieces, None, stats, False)
+            for s in new_states:
+                Frontier.append((s.id, s.depth, back_pointer(key, s.move)))
+            if stats != None:
+                stats.sizes(len(Frontier), len(Explored))
+    return None
+        
+
+
+def IDAStar(init_state, pieces, heuristic=None, tt_size=0, stats=None):
+    """
+    Iterative deepening A*. Each pass is a depth first search that cuts off
+    every state whose f is above the bound, and the next pass raises the
+    bound to the smallest f that was cut off. Only the current path and the
+    siblings still to try are kept, so memory grows with the solution depth.
+
+    With tt_size > 0 a transposition table remembers the shallowest depth
+    each board was reached at and in which pass. A board is skipped when it
+    was reached shallower before, or as deep earlier in this pass: either
+    way that visit searches the board with at least as much of the bound
+    left. The table holds at most tt_size boards and drops the least
+    recently used one when full.
+
+    :return: The goal state at the end of the solution, or None.
+    :rtype: Optional[State]
+    """
+    bound = init_state.f
+    table = OrderedDict()
+    timed = stats != None and stats.timed
+
+    # False if s was reached as cheaply before, else remember it
+    def tt_store(s):
+        if s.id in table:
+            depth, seen_bound = table[s.id]
+            if depth < s.depth or (depth == s.depth and seen_bound == bound):
+                table.move_to_end(s.id)
+                return False
+        table[s.id] = (s.depth, bound)
+        table.move_to_end(s.id)
+        if len(table) > tt_size:
+            table.popitem(last=False)
+        return True
+
+    while True:
+        next_bound = None
+        on_path = set([init_state.id])
+        # each frame is a state and its children still to try
+        stack = [[init_state, None]]
+        while len(stack) > 0:
+            frame = stack[-1]
+            curr = frame[0]
+            if frame[1] == None:
+                if curr.f > bound:
+                    if next_bound == None or curr.f < next_bound:
+                        next_bound = curr.f
+                    stack.pop()
+                    on_path.discard(curr.id)
+                    continue
+                if curr.board.goal_test():
+                    return curr
+                # best child last, it is tried first
+                frame[1] = sorted(gen_states(curr, pieces, heuristic, stats), reverse=True)
+            if len(frame[1]) == 0:
+                stack.pop()
+                on_path.discard(curr.id)
+                continue
+            if timed:
+                start = clocks()
+            s = frame[1].pop()
+            if s.id in on_path or (tt_size > 0 and not tt_store(s)):
+                if stats != None:
+                    stats.duplicates += 1
+                if timed:
+                    stats.add_time('dedup', start)
+                continue
+            on_path.add(s.id)
+            stack.append([s, None])
+            if stats != None:
+                stats.sizes(len(stack), len(table) + len(on_path))
+                if timed:
+                    stats.add_time('dedup', start)
+        if next_bound == None:
+            return None
+        bound = next_bound
+
+
+def goal_boards(board):
+    """
+    Every board with the same pieces as board and the goal piece on (3, 1),
+    found by filling the other cells row by row with each piece that fits.
+
+    :param board: Any board of the puzzle.
+    :type board: Board
+    :return: The goal boards, built with the same engine as board.
+    :rtype: List[Board]
+    """
+    counts = {'.': 0, char_single: 0, '<': 0, '^': 0}
+    for i in range(5):
+        for j in range(4):
+            ch = board.cell(i, j)
+            if ch in counts:
+                counts[ch] += 1
+
+    grid = [[None] * 4 for i in range(5)]
+    for i, j in goal_cells:
+        grid[i][j] = char_goal
+    out = []
+
+    def place(cell):
+        while cell < 20 and grid[cell // 4][cell % 4] != None:
+            cell += 1
+        if cell == 20:
+            goal = Board(read_pieces(grid))
+            if isinstance(board, BitBoard):
+                goal = BitBoard.from_board(goal)
+            out.append(goal)
+            return
+        i, j = cell // 4, cell % 4
+        # the symbols to draw for each piece, relative to this cell
+        options = [('.', [(0, 0, '.')]), (char_single, [(0, 0, char_single)]),
+                   ('<', [(0, 0, '<'), (0, 1, '>')]), ('^', [(0, 0, '^'), (1, 0, 'v')])]
+        for name, shape in options:
+            if counts[name] == 0:
+                continue
+            if any(i + di >= 5 or j + dj >= 4 or grid[i + di][j + dj] != None for di, dj, ch in shape):
+                continue
+            counts[name] -= 1
+            for di, dj, ch in shape:
+                grid[i + di][j + dj] = ch
+            place(cell + 1)
+            for di, dj, ch in shape:
+                grid[i + di][j + dj] = None
+            counts[name] += 1
+
+    place(0)
+    return out
+
+
+def BiBFS(init_state, pieces, stats=None):
+    """
+    Bidirectional breadth first search. One side starts from init_state and
+    the other from every goal board (see goal_boards); moves can be played
+    backwards, so both sides use the same successors. Each round expands
+    the smaller frontier by a whole layer and checks every new board against
+    the boards the other side has seen. The shortest meeting found in that
+    layer gives an optimal solution.
+
+    :return: The goal state at the end of the solution, or None.
+    :rtype: Optional[State]
+    """
+    if init_state.board.goal_test():
+        return init_state
+    Forward = {init_state.id: init_state}
+    Backward = {}
+    for goal in goal_boards(init_state.board):
+        goal_state = State(goal, 0, 0)
+        Backward[goal_state.id] = goal_state
+    f_layer = [init_state]
+    b_layer = list(Backward.values())
+    timed = stats != None and stats.timed
+
+    while len(f_layer) > 0 and len(b_layer) > 0:
+        forward = len(f_layer) <= len(b_layer)
+        if forward:
+            layer, seen, other = f_layer, Forward, Backward
+        else:
+            layer, seen, other = b_layer, Backward, Forward
+        next_layer = []
+        meet = None
+        for curr in layer:
+            children = gen_states(curr, pieces, None, stats)
+            if timed:
+                start = clocks()
+            for s in children:
+                if s.id in seen:
+                    if stats != None:
+                        stats.duplicates += 1
+                    continue
+                seen[s.id] = s
+                next_layer.append(s)
+                if s.id in other and (meet == None or s.depth + other[s.id].depth < meet[0]):
+                    meet = (s.depth + other[s.id].depth, s.id)
+            if timed:
+                stats.add_time('dedup', start)
+        if forward:
+            f_layer = next_layer
+        else:
+            b_layer = next_layer
+        if stats != None:
+            stats.sizes(len(f_layer) + len(b_layer), len(Forward) + len(Backward))
+
+        if meet != None:
+            # walk the backward half from the meeting board to the goal,
+            # hanging each board under the forward half
+            curr = Forward[meet[1]]
+            back = Backward[meet[1]].parent
+            while back != None:
+                curr = State(back.board, 0, curr.depth + 1, curr)
+                back = back.parent
+            return curr
+    return None
+
+
+#====================================================================================
+# Hash distributed A* (HDA*)
+#
+# One puzzle is searched by several processes. Every board key belongs to one
+# worker (hda_owner), which keeps the open list, the cheapest known depth and
+# the back pointer of the boards it owns. A worker expands its best state and
+# sends each successor to the owner of its key, in batches, as (key, depth,
+# back pointer); the owner rebuilds the board from the key. Workers search the
+# bits engine, and the moves played are the indexes into its successors().
+#
+# Nothing is expanded in f order across workers, so a board can be reached
+# more cheaply after it was expanded; it is then opened again. The cheapest
+# goal found so far (the incumbent) is shared, and a worker is idle when it has
+# nothing left that could beat it. The search is over when every worker is
+# idle and no batch is in flight: every open state then has f no better than
+# the incumbent, which is optimal because the heuristic is admissible.
+#
+# Termination is checked by the parent process: a snapshot of the epochs,
+# then every worker idle, no state in flight, every worker still idle and the
+# epochs unchanged. A worker only sends while it is busy, and becomes busy
+# again only by taking a batch, which bumps its epoch before the in flight
+# count goes down, so a batch cannot slip between the checks.
+#
+# How HDA* scales with cores has not been measured. On a single CPU every
+# extra worker only adds queueing: the classic layout takes about 1.0 s with
+# one worker and 1.6 s with four, against 0.5 s for A*.
+
+# successors sent to another worker in one message
+hda_batch = 64
+
+# a worker flushes every batch after this many expansions, so the others are
+# not kept waiting for states near the end of the search
+hda_flush_every = 32
+
+# seconds an idle worker, and the parent, wait for a message before checking again
+hda_poll = 0.005
+
+
+def hda_owner(key, workers):
+    """
+    The worker that owns a board key. The key is scrambled first, since
+    most moves leave its low bits (the top row) alone.
+
+    :rtype: int
+    """
+    return (((key * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> 32) % workers
+
+
+def hda_worker(index, workers, start_key, heuristic, budgets, inboxes, results, shared):
+    """
+    One HDA* worker, run in its own process until it is sent 'stop' or
+    fails. A failure is put on results as ('error', index, message), for
+    HDAStar to stop the search.
+    """
+    try:
+        hda_search(index, workers, start_key, heuristic, budgets, inboxes, results, shared)
+    except Exception as e:
+        results.put(('error', index, '{}: {}'.format(type(e).__name__, e)))
+
+
+def hda_search(index, workers, start_key, heuristic, budgets, inboxes, results, shared):
+    """
+    The search of one HDA* worker (see hda_worker).
+
+    Messages to a worker: ('states', [(key, depth, back pointer)]),
+    ('back', key) for the back pointer of a key it owns, and ('stop',).
+    It puts on results ('limit', reason) when one of its budgets runs out,
+    ('back', key, back pointer) and, last, ('stats', counters).
+
+    :param budgets: max_nodes (this worker's share), deadline and max_memory.
+    :type budgets: dict
+    :param shared: The incumbent depth and goal key, the states in flight,
+        and the idle flag and epoch of every worker.
+    :type shared: dict
+    """
+    incumbent, goal_key = shared['incumbent'], shared['goal_key']
+    in_flight, idle, epochs = shared['in_flight'], shared['idle'], shared['epochs']
+    inbox = inboxes[index]
+    stats = SearchStats(budgets['max_nodes'], False, budgets['deadline'], budgets['max_memory'])
+    Open = []
+    Best_g = {}
+    Back = {}
+    count = 0
+    outboxes = [[] for i in range(workers)]
+    searching = True
+    since_flush = 0
+
+    def send(owner):
+        batch = outboxes[owner]
+        outboxes[owner] = []
+        # counted before it is queued, so it is in flight until taken in
+        with in_flight.get_lock():
+            in_flight.value += len(batch)
+        inboxes[owner].put(('states', batch))
+
+    def add(state, back):
+        nonlocal count
+        key = state.id
+        if key in Best_g and Best_g[key] <= state.depth:
+            stats.duplicates += 1
+            return
+        Best_g[key] = state.depth
+        Back[key] = back
+        count += 1
+        heappush(Open, (state.f, state.h, count, state))
+
+    if hda_owner(start_key, workers) == index:
+        add(State(BitBoard.from_key(start_key), 0, 0, None, heuristic), no_parent)
+
+    while True:
+        # f is h + depth + 1, so a state with f > incumbent cannot do better
+        busy = searching and len(Open) > 0 and Open[0][0] <= incumbent.value
+        if not busy:
+            for owner in range(workers):
+                if len(outboxes[owner]) > 0:
+                    send(owner)
+            since_flush = 0
+            idle[index] = 1
+        try:
+            if busy:
+                message = inbox.get_nowait()
+            else:
+                message = inbox.get(timeout=hda_poll)
+        except queue.Empty:
+            message = None
+
+        if message != None:
+            if message[0] == 'states':
+                idle[index] = 0
+                epochs[index] += 1
+                for key, depth, back in message[1]:
+                    if key in Best_g and Best_g[key] <= depth:
+                        stats.duplicates += 1
+                        continue
+                    add(State(BitBoard.from_key(key), 0, depth, None, heuristic), back)
+                with in_flight.get_lock():
+                    in_flight.value -= len(message[1])
+            elif message[0] == 'back':
+                results.put(('back', message[1], Back[message[1]]))
+            elif message[0] == 'stop':
+                stats.sizes(len(Open), len(Best_g))
+                results.put(('stats', {'expanded': stats.expanded, 'generated': stats.generated,
+                                       'duplicates': stats.duplicates, 'peak_frontier': stats.peak_frontier,
+                                       'peak_visited': stats.peak_visited}))
+                return
+            continue
+
+        if not busy:
+            continue
+        curr_f, curr_h, curr_count, curr = heappop(Open)
+        key = curr.id
+        # stale entry: the board was reached more cheaply since
+        if curr.depth > Best_g[key]:
+            continue
+        if curr.board.goal_test():
+            with incumbent.get_lock():
+                if curr.depth < incumbent.value:
+                    incumbent.value = curr.depth
+                    goal_key.value = key
+            continue
+        try:
+            children = gen_states(curr, None, heuristic, stats, False)
+        except SearchLimit as limit:
+            results.put(('limit', limit.reason))
+            searching = False
+            continue
+        for s in children:
+            owner = hda_owner(s.id, workers)
+            if owner == index:
+                add(s, back_pointer(key, s.move))
+            else:
+                outboxes[owner].append((s.id, s.depth, back_pointer(key, s.move)))
+                if len(outboxes[owner]) >= hda_batch:
+                    send(owner)
+        stats.sizes(len(Open), len(Best_g))
+        since_flush += 1
+        if since_flush >= hda_flush_every:
+            for owner in range(workers):
+                if len(outboxes[owner]) > 0:
+                    send(owner)
+            since_flush = 0
+
+
+def HDAStar(init_state, pieces, heuristic=None, workers=None, stats=None):
+    """
+    Hash distributed A* over worker processes (see hda_worker). The budgets
+    of stats are shared out: each worker may expand its share of max_nodes
+    and checks the deadline and the memory of its own process.
+
+    :param heuristic: The heuristic (get_h if None), a module level function
+        so the workers can be given it.
+    :type heuristic: Optional[Callable[[Board], int]]
+    :param workers: The number of worker processes, one per CPU if None.
+    :type workers: Optional[int]
+    :return: The goal state at the end of an optimal solution, or None.
+    :rtype: Optional[State]
+    :raises SearchLimit: If a worker runs out of one of its budgets.
+    :raises RuntimeError: If a worker fails or its process dies, e.g.
+        killed for running out of memory.
+    """
+    if heuristic == None:
+        heuristic = get_h
+    if workers == None:
+        workers = os.cpu_count() or 1
+    if stats == None:
+        stats = SearchStats()
+    start_key = init_state.id
+    budgets = {'max_nodes': None, 'deadline': stats.deadline, 'max_memory': stats.max_memory}
+    if stats.max_nodes != None:
+        budgets['max_nodes'] = -(-stats.max_nodes // workers)
+    shared = {'incumbent': multiprocessing.Value('q', 1 << 62), 'goal_key': multiprocessing.Value('q', 0),
+              'in_flight': multiprocessing.Value('q', 0),
+              'idle': multiprocessing.Array('b', workers), 'epochs': multiprocessing.Array('q', workers)}
+    inboxes = [multiprocessing.Queue() for i in range(workers)]
+    results = multiprocessing.Queue()
+    processes = []
+    for index in range(workers):
+        process = multiprocessing.Process(target=hda_worker, args=(index, workers, start_key, heuristic,
+                                                                   budgets, inboxes, results, shared))
+        process.start()
+        processes.append(process)
+
+    idle, epochs, in_flight = shared['idle'], shared['epochs'], shared['in_flight']
+    limit = None
+    error = None
+
+    def failed(message):
+        return 'worker {} failed: {}'.format(message[1], message[2])
+
+    def failure():
+        # a worker only exits before it is sent 'stop' if it failed, and
+        # then never sends anything again
+        for index, process in enumerate(processes):
+            if process.exitcode != None:
+                # it may have said why before it exited
+                try:
+                    while True:
+                        message = results.get(timeout=hda_poll)
+                        if message[0] == 'error':
+                            return failed(message)
+                except queue.Empty:
+                    pass
+                return 'worker {} exited with code {}'.format(index, process.exitcode)
+        return None
+
+    def next_result():
+        nonlocal error
+        while True:
+            try:
+                message = results.get(timeout=hda_poll)
+            except queue.Empty:
+                error = failure()
+                if error != None:
+                    return None
+                continue
+            if message[0] == 'error':
+                error = failed(message)
+                return None
+            return message
+
+    while True:
+        try:
+            message = results.get(timeout=hda_poll)
+            if message[0] == 'limit':
+                limit = message[1]
+                break
+            if message[0] == 'error':
+                error = failed(message)
+                break
+        except queue.Empty:
+            pass
+        error = failure()
+        if error != None:
+            break
+        # a worker bumps its epoch when it takes in a batch, so a batch taken
+        # at any point between the snapshot and the last check is noticed
+        seen_epochs = list(epochs)
+        if all(idle) and in_flight.value == 0 and all(idle) and list(epochs) == seen_epochs:
+            break
+
+    # follow the back pointers from the goal, asking the owner of each board
+    goal = None
+    if limit == None and error == None and shared['incumbent'].value < 1 << 62:
+        Back = {}
+        key = shared['goal_key'].value
+        while True:
+            inboxes[hda_owner(key, workers)].put(('back', key))
+            message = next_result()
+            while message != None and message[0] != 'back':
+                message = next_result()
+            if message == None:
+                break
+            Back[key] = message[2]
+            if message[2] == no_parent:
+                break
+            key = message[2] >> move_bits
+    if limit == None and error == None and shared['incumbent'].value < 1 << 62:
+        start = State(BitBoard.from_key(start_key), 0, init_state.depth)
+        path = get_sol(replay_path(start, Back, shared['goal_key'].value))
+        # the path is played in the bits engine, hand it back in the engine
+        # of init_state
+        goal = init_state
+        for state in path[1:]:
+            board = state.board
+            if not isinstance(init_state.board, BitBoard):
+                board = board_from_key(board.key(), 'grid')
+            goal = State(board, 0, goal.depth + 1, goal)
+
+    for inbox in inboxes:
+        inbox.put(('stop',))
+    # a worker that failed or died sends no stats, so stop waiting once
+    # every process has exited and nothing is left on results
+    stopped = 0
+    while stopped < workers:
+        try:
+            message = results.get(timeout=hda_poll)
+        except queue.Empty:
+            if not any(process.is_alive() for process in processes):
+                break
+            continue
+        if message[0] == 'stats':
+            stopped += 1
+            for name in ('expanded', 'generated', 'duplicates', 'peak_frontier', 'peak_visited'):
+                setattr(stats, name, getattr(stats, name) + message[1][name])
+    for process in processes:
+        process.join()
+
+    if error != None:
+        raise RuntimeError('hdastar: ' + error)
+    if limit != None:
+        stats.limit = limit
+        raise SearchLimit(limit)
+    return goal
+
+
+#====================================================================================
+# Vectorized layer BFS
+#
+# A breadth first search that keeps each layer as a sorted numpy array of
+# board keys and plays every move on the whole layer at once. Each move of
+# move_table becomes a template (mask, before, after) on the packed key: mask
+# covers the 3 bit codes of the cells the piece is on and the cells it fills,
+# the move can be played on x if x & mask == before, and it gives
+# (x & ~mask) | after. A move graph edge only joins boards of the same or
+# neighbouring layers, so a new layer is deduplicated against the layer it
+# came from and the one before that. numpy is only needed by this search.
+
+# (mask, before, after) of every move, as ints, and as numpy arrays
+move_templates = None
+np_templates = None
+
+
+def build_move_templates():
+    """
+    Every move of move_table as a template on packed keys.
+
+    :rtype: List[Tuple[int, int, int]]
+    """
+    moves = set()
+    for pair_moves in move_table.values():
+        moves.update(pair_moves)
+    templates = []
+    for cls, src, dst, filled, emptied, delta, spaces in sorted(moves):
+        corner = src.bit_length() - 1
+        mask = 0
+        before = 0
+        for i, j, ch in bit_shapes[cls]:
+            cell = corner + i * 4 + j
+            mask |= 7 << (3 * cell)
+            before |= cell_codes[ch] << (3 * cell)
+        for cell in range(20):
+            if filled & (1 << cell):
+                mask |= 7 << (3 * cell)
+        templates.append((mask, before, before + delta))
+    return templates
+
+
+def NumpyBFS(init_state, pieces, stats=None):
+    """
+    Breadth first search over whole layers of packed keys with numpy (see
+    above). All the layers are kept to walk the solution back: from the
+    goal, each step plays every move backwards and picks the smallest key
+    found in the layer before.
+
+    :return: The goal state at the end of an optimal solution, or None.
+    :rtype: Optional[State]
+    :raises ImportError: If numpy is not installed.
+    """
+    global move_templates, np_templates
+    if np == None:
+        raise ImportError("the 'npbfs' search needs numpy")
+    if move_templates == None:
+        move_templates = build_move_templates()
+        np_templates = [(np.uint64(mask), np.uint64(before), np.uint64(after),
+                         np.uint64(~mask & 0xFFFFFFFFFFFFFFFF)) for mask, before, after in move_templates]
+    if stats == None:
+        stats = SearchStats()
+    timed = stats.timed
+
+    goal_mask = 0
+    goal_pattern = 0
+    for i, j in goal_cells:
+        goal_mask |= 7 << (3 * (i * 4 + j))
+        goal_pattern |= cell_codes[char_goal] << (3 * (i * 4 + j))
+    goal_mask, goal_pattern = np.uint64(goal_mask), np.uint64(goal_pattern)
+
+    layers = [np.array([init_state.id], dtype=np.uint64)]
+    previous = np.empty(0, dtype=np.uint64)
+    while True:
+        layer = layers[-1]
+        if len(layer) == 0:
+            return None
+        goals = layer[(layer & goal_mask) == goal_pattern]
+        if len(goals) > 0:
+            break
+        stats.expanded += len(layer)
+        stats.check_budgets(False)
+
+        if timed:
+            start = clocks()
+        children = []
+        for mask, before, after, keep in np_templates:
+            hit = layer[(layer & mask) == before]
+            if len(hit) > 0:
+                children.append((hit & keep) | after)
+        if timed:
+            stats.add_time('movegen', start)
+            start = clocks()
+        if len(children) > 0:
+            children = np.concatenate(children)
+        else:
+            children = np.empty(0, dtype=np.uint64)
+        stats.generated += len(children)
+        new_layer = np.unique(children)
+        new_layer = np.setdiff1d(new_layer, layer, assume_unique=True)
+        new_layer = np.setdiff1d(new_layer, previous, assume_unique=True)
+        stats.duplicates += len(children) - len(new_layer)
+        if timed:
+            stats.add_time('dedup', start)
+        previous = layer
+        layers.append(new_layer)
+        stats.sizes(len(new_layer), sum(len(l) for l in layers))
+
+    # walk back from the smallest goal key, one layer at a time
+    path = [int(goals[0])]
+    for depth in range(len(layers) - 2, -1, -1):
+        key = path[-1]
+        earlier = layers[depth]
+        best = None
+        for mask, before, after in move_templates:
+            if key & mask == after:
+                prev_key = (key & ~mask) | before
+                i = np.searchsorted(earlier, prev_key)
+                if i < len(earlier) and int(earlier[i]) == prev_key and (best == None or prev_key < best):
+                    best = prev_key
+        path.append(best)
+    path.reverse()
+
+    engine = 'bits' if isinstance(init_state.board, BitBoard) else 'grid'
+    curr = init_state
+    for key in path[1:]:
+        curr = State(board_from_key(key, engine), 0, curr.depth + 1, curr)
+    return curr
+
+
+#====================================================================================
+# External memory BFS
+#
+# A breadth first search that keeps its layers on disk, for boards and sets of
+# pieces whose boards do not all fit in memory. The board can be any size: a
+# layout of width x height cells is packed like pack_grid, cell (row, col) in
+# bits 3 * (row * width + col) and up, and the goal piece has to reach the
+# bottom of the middle columns. On disk a key is a big endian record of
+# record_size bytes, so records sort in the same order as their keys and are
+# compared as bytes.
+#
+# Layer d + 1 is found by reading layer d, playing the move templates (see
+# Vectorized layer BFS) on every key and collecting the children in memory;
+# every run_size children are sorted, deduplicated and written out as a run.
+# The runs are merged, fan_in at a time and in passes while there are more,
+# and the boards of layers d and d - 1 are dropped on the way (delayed
+# duplicate detection). What is left is written as layer d + 1. Runs and
+# layers are memory mapped when read back.
+#
+# Everything is kept in a work directory with a json manifest of the start
+# board and the size of every layer finished. A layer is written under a
+# temporary name and renamed when it is complete, so a search stopped at any
+# point (a budget, a crash, Ctrl-C) carries on from the last layer finished
+# when it is started again with the same work directory.
+
+# children sorted in memory before they are written out as a run
+ext_run_size = 1 << 20
+
+# runs merged at once
+ext_fan_in = 64
+
+# bytes buffered by every run and layer file written
+ext_io_buffer = 1 << 20
+
+ext_manifest = 'manifest.json'
+
+
+def build_layout_templates(width, height):
+    """
+    Every move on a width x height board as a template (mask, before, after)
+    on packed keys, the same moves Board.legality finds on the 4x5 board.
+
+    :rtype: List[Tuple[int, int, int]]
+    """
+    templates = []
+    for cls, shape in enumerate(bit_shapes):
+        steps = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+        if cls == bit_horizontal:
+            steps += [(0, 2), (0, -2)]
+        for row in range(height):
+            for col in range(width):
+                old = [(row + i, col + j, ch) for i, j, ch in shape]
+                if any(i >= height or j >= width for i, j, ch in old):
+                    continue
+                for di, dj in steps:
+                    new = [(i + di, j + dj, ch) for i, j, ch in old]
+                    if any(i < 0 or i >= height or j < 0 or j >= width for i, j, ch in new):
+                        continue
+                    mask = 0
+                    before = 0
+                    after = 0
+                    for i, j, ch in old + new:
+                        mask |= 7 << (3 * (i * width + j))
+                    for i, j, ch in old:
+                        before |= cell_codes[ch] << (3 * (i * width + j))
+                    for i, j, ch in new:
+                        after |= cell_codes[ch] << (3 * (i * width + j))
+                    templates.append((mask, before, after))
+    return templates
+
+
+def templates_by_cell(templates, cells):
+    """
+    Index move templates by the first cell they fill, so a key only tries
+    the moves into its empty cells.
+
+    :param cells: The cells of the board.
+    :type cells: int
+    :rtype: List[List[Tuple[int, int, int]]]
+    """
+    by_cell = [[] for cell in range(cells)]
+    for mask, before, after in templates:
+        for cell in range(cells):
+            if (mask >> (3 * cell)) & 7 and not (before >> (3 * cell)) & 7:
+                by_cell[cell].append((mask, before, after))
+                break
+    return by_cell
+
+
+def layout_goal(width, height):
+    """
+    :return: The mask of the cells the goal piece has to cover on a width x
+        height board, the bottom two rows of the middle columns (left of the
+        middle if width is odd), and the key pattern of the goal piece on them.
+    :rtype: Tuple[int, int]
+    """
+    mask = 0
+    pattern = 0
+    col = (width - 2) // 2
+    for i in (height - 2, height - 1):
+        for j in (col, col + 1):
+            mask |= 7 << (3 * (i * width + j))
+            pattern |= cell_codes[char_goal] << (3 * (i * width + j))
+    return mask, pattern
+
+
+def record_size(width, height):
+    """
+    :return: The bytes a key of a width x height board takes on disk.
+    :rtype: int
+    """
+    return (3 * width * height + 7) // 8
+
+
+def parse_layout(text):
+    """
+    Pack a board of any size, drawn in text with the symbols of a puzzle file.
+
+    :return: The width, height and packed key of the board.
+    :rtype: Tuple[int, int, int]
+    :raises ValueError: If text is not a valid board.
+    """
+    lines = [line for line in text.splitlines() if line.strip() != '']
+    if len(lines) == 0 or any(len(line) != len(lines[0]) for line in lines):
+        raise ValueError('a board is rows of symbols of the same length')
+    width, height = len(lines[0]), len(lines)
+
+    def at(i, j):
+        if 0 <= i < height and 0 <= j < width:
+            return lines[i][j]
+        return None
+
+    # each half of a '<>' or '^v' needs its other half, and the goal piece
+    # is the only 2x2 block of goal symbols
+    goal = []
+    key = 0
+    for i, line in enumerate(lines):
+        for j, ch in enumerate(line):
+            if (ch not in cell_codes or (ch == '<' and at(i, j + 1) != '>') or (ch == '>' and at(i, j - 1) != '<')
+                    or (ch == '^' and at(i + 1, j) != 'v') or (ch == 'v' and at(i - 1, j) != '^')):
+                raise ValueError('not a valid board:\n' + '\n'.join(lines))
+            if ch == char_goal:
+                goal.append((i, j))
+            key |= cell_codes[ch] << (3 * (i * width + j))
+    if len(goal) != 4 or goal != [(goal[0][0] + i, goal[0][1] + j) for i in (0, 1) for j in (0, 1)] or '.' not in text:
+        raise ValueError('not a valid board:\n' + '\n'.join(lines))
+    return width, height, key
+
+
+def unpack_layout(key, width, height):
+    """
+    Inverse of parse_layout.
+
+    :return: The rows of the board.
+    :rtype: List[str]
+    """
+    return [''.join(cell_chars[(key >> (3 * (i * width + j))) & 7] for j in range(width)) for i in range(height)]
+
+
+class RecordFile:
+    """
+    A file of fixed size records, memory mapped. Indexes and len() count
+    records, so a sorted file can be searched in place with bisect.
+    """
+
+    def __init__(self, filename, size):
+        """
+        :param filename: The file, a whole number of records long.
+        :type filename: str
+        :param size: The bytes of each record.
+        :type size: int
+        """
+        self.size = size
+        self.count = os.path.getsize(filename) // size
+        self.map = None
+        # an empty file cannot be mapped
+        if self.count > 0:
+            record_file = open(filename, "rb")
+            self.map = mmap.mmap(record_file.fileno(), 0, access=mmap.ACCESS_READ)
+            record_file.close()
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        return self.map[i * self.size:(i + 1) * self.size]
+
+    def __iter__(self):
+        size = self.size
+        for start in range(0, self.count * size, size):
+            yield self.map[start:start + size]
+
+    def close(self):
+        if self.map != None:
+            self.map.close()
+
+
+def write_records(filename, records, io_buffer=ext_io_buffer):
+    """
+    Write records to filename, dropping a record equal to the one before it.
+
+    :param records: The records, sorted.
+    :type records: Iterable[bytes]
+    :return: The records written.
+    :rtype: int
+    """
+    out = open(filename, "wb", buffering=io_buffer)
+    count = 0
+    prev = None
+    for record in records:
+        if record != prev:
+            out.write(record)
+            count += 1
+            prev = record
+    out.close()
+    return count
+
+
+def subtract_records(records, exclude):
+    """
+    Yield the records that are not in exclude, both sorted.
+    """
+    ex = next(exclude, None)
+    for record in records:
+        while ex != None and ex < record:
+            ex = next(exclude, None)
+        if record != ex:
+            yield record
+
+
+def external_bfs(start_key, width, height, workdir=None, run_size=ext_run_size, fan_in=ext_fan_in, io_buffer=ext_io_buffer, stats=None):
+    """
+    Breadth first search with its layers on disk (see above). The solution
+    is walked back from the goal like NumpyBFS does, searching each layer
+    file in place.
+
+    :param start_key: The start board, packed as by parse_layout.
+    :type start_key: int
+    :param width: The columns of the board.
+    :type width: int
+    :param height: The rows of the board.
+    :type height: int
+    :param workdir: The directory the layers are kept in. The search goes on
+        from the layers already there; a temporary directory, removed when
+        the search ends, if None.
+    :type workdir: Optional[str]
+    :param run_size: Children sorted in memory before a run is written.
+    :type run_size: int
+    :param fan_in: Runs merged at once.
+    :type fan_in: int
+    :param io_buffer: Bytes buffered by every file written.
+    :type io_buffer: int
+    :return: The keys of an optimal solution from start_key to the goal, or
+        None if there is none.
+    :rtype: Optional[List[int]]
+    :raises ValueError: If workdir holds the layers of another search.
+    """
+    if workdir == None:
+        workdir = tempfile.mkdtemp(prefix='hrd_')
+        try:
+            return external_bfs(start_key, width, height, workdir, run_size, fan_in, io_buffer, stats)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    if stats == None:
+        stats = SearchStats()
+    timed = stats.timed
+    size = record_size(width, height)
+    templates = build_layout_templates(width, height)
+    goal_mask, goal_pattern = layout_goal(width, height)
+    cells = width * height
+    by_cell = templates_by_cell(templates, cells)
+
+    def path_of(name):
+        return os.path.join(workdir, name)
+
+    def layer_name(depth):
+        return 'layer_{}.bin'.format(depth)
+
+    def save_manifest():
+        manifest_out = open(path_of(ext_manifest + '.tmp'), "w")
+        json.dump(manifest, manifest_out)
+        manifest_out.close()
+        os.replace(path_of(ext_manifest + '.tmp'), path_of(ext_manifest))
+
+    os.makedirs(workdir, exist_ok=True)
+    manifest = {'version': movegen_version, 'width': width, 'height': height, 'start': start_key, 'layers': []}
+    if os.path.exists(path_of(ext_manifest)):
+        manifest_in = open(path_of(ext_manifest), "r")
+        saved = json.load(manifest_in)
+        manifest_in.close()
+        if any(saved.get(name) != manifest[name] for name in ('version', 'width', 'height', 'start')):
+            raise ValueError('{} holds the layers of another search'.format(workdir))
+        manifest = saved
+    # runs and temporary files were left by a layer that was not finished
+    for name in os.listdir(workdir):
+        if name.startswith('run_') or name.endswith('.tmp'):
+            os.remove(path_of(name))
+    if len(manifest['layers']) == 0:
+        write_records(path_of(layer_name(0)), [start_key.to_bytes(size, 'big')], io_buffer)
+        manifest['layers'].append(1)
+        save_manifest()
+
+    depth = len(manifest['layers']) - 1
+    goal = None
+    while goal == None:
+        if manifest['layers'][depth] == 0:
+            return None
+        layer = RecordFile(path_of(layer_name(depth)), size)
+        runs = []
+        children = []
+        generated = 0
+        try:
+            if timed:
+                start = clocks()
+            for record in layer:
+                key = int.from_bytes(record, 'big')
+                if key & goal_mask == goal_pattern:
+                    goal = key
+                    break
+                stats.expanded += 1
+                stats.check_budgets()
+                for cell in range(cells):
+                    if not (key >> (3 * cell)) & 7:
+                        for mask, before, after in by_cell[cell]:
+                            if key & mask == before:
+                                children.append(key - before + after)
+                if len(children) >= run_size:
+                    if timed:
+                        stats.add_time('movegen', start)
+                        start = clocks()
+                    generated += len(children)
+                    children.sort()
+                    runs.append(path_of('run_{}_{}.bin'.format(depth + 1, len(runs))))
+                    write_records(runs[-1], (key.to_bytes(size, 'big') for key in children), io_buffer)
+                    children = []
+                    if timed:
+                        stats.add_time('dedup', start)
+                        start = clocks()
+            if timed:
+                stats.add_time('movegen', start)
+        finally:
+            layer.close()
+        if goal != None:
+            for run in runs:
+                os.remove(run)
+            break
+
+        if timed:
+            start = clocks()
+        generated += len(children)
+        stats.generated += generated
+        if len(children) > 0:
+            children.sort()
+            runs.append(path_of('run_{}_{}.bin'.format(depth + 1, len(runs))))
+            write_records(runs[-1], (key.to_bytes(size, 'big') for key in children), io_buffer)
+        merge_pass = 0
+        while len(runs) > fan_in:
+            merge_pass += 1
+            merged = []
+            for i in range(0, len(runs), fan_in):
+                group = [RecordFile(run, size) for run in runs[i:i + fan_in]]
+                merged.append(path_of('run_{}_{}_{}.bin'.format(depth + 1, merge_pass, len(merged))))
+                write_records(merged[-1], heap_merge(*group), io_buffer)
+                for records in group:
+                    records.close()
+                for run in runs[i:i + fan_in]:
+                    os.remove(run)
+            runs = merged
+
+        group = [RecordFile(run, size) for run in runs]
+        # a child is one move from layer depth, so it is in layer depth - 1,
+        # depth or depth + 1
+        seen = [RecordFile(path_of(layer_name(d)), size) for d in range(max(depth - 1, 0), depth + 1)]
+        count = write_records(path_of(layer_name(depth + 1) + '.tmp'),
+                              subtract_records(heap_merge(*group), heap_merge(*seen)), io_buffer)
+        for records in group + seen:
+            records.close()
+        for run in runs:
+            os.remove(run)
+        os.replace(path_of(layer_name(depth + 1) + '.tmp'), path_of(layer_name(depth + 1)))
+        manifest['layers'].append(count)
+        save_manifest()
+        if timed:
+            stats.add_time('dedup', start)
+        stats.duplicates += generated - count
+        stats.sizes(count, sum(manifest['layers']))
+        depth += 1
+
+    # walk back from the smallest goal key, one layer at a time
+    path = [goal]
+    for d in range(depth - 1, -1, -1):
+        key = path[-1]
+        earlier = RecordFile(path_of(layer_name(d)), size)
+        best = None
+        for mask, before, after in templates:
+            if key & mask == after:
+                prev_key = key - after + before
+                record = prev_key.to_bytes(size, 'big')
+                i = bisect_left(earlier, record)
+                if i < len(earlier) and earlier[i] == record and (best == None or prev_key < best):
+                    best = prev_key
+        earlier.close()
+        path.append(best)
+    path.reverse()
+    return path
+
+
+def ExternalBFS(init_state, pieces, external=None, stats=None):
+    """
+    external_bfs on the 4x5 board.
+
+    :param external: workdir, run_size, fan_in and io_buffer for
+        external_bfs, the defaults for any left out.
+    :type external: Optional[dict]
+    :return: The goal state at the end of an optimal solution, or None.
+    :rtype: Optional[State]
+    """
+    if external == None:
+        external = {}
+    path = external_bfs(init_state.id, 4, 5, stats=stats, **external)
+    if path == None:
+        return None
+    engine = 'bits' if isinstance(init_state.board, BitBoard) else 'grid'
+    curr = init_state
+    for key in path[1:]:
+        curr = State(board_from_key(key, engine), 0, curr.depth + 1, curr)
+    return curr
+
+
+#====================================================================================
+# Path shortening
+#
+# DFS returns the first path it finds, thousands of moves where a hundred do.
+# The path is shortened after the search, on packed keys with the move
+# templates: a board that comes back cuts out the moves in between, and from
+# each board a BFS of at most radius moves looks for a board further along the
+# path that it reaches in fewer moves than the path takes. The path jumps to
+# the one that saves the most and carries on from there. Only boards one legal
+# move apart are ever joined, so the result is still a solution, and every BFS
+# is bounded by the radius, so this costs far less than an optimal search. The
+# path need not come out optimal.
+
+
+def splice_cycles(keys):
+    """
+    Cut out the moves between two visits of the same board.
+
+    :param keys: The keys of a path, each board one move from the one before.
+    :type keys: List[int]
+    :rtype: List[int]
+    """
+    out = []
+    index = {}  # key -> position in out
+    for key in keys:
+        if key in index:
+            for dropped in out[index[key] + 1:]:
+                del index[dropped]
+            del out[index[key] + 1:]
+        else:
+            index[key] = len(out)
+            out.append(key)
+    return out
+
+
+def shortcut(keys, index, pos, radius, by_cell):
+    """
+    BFS of at most radius moves from keys[pos] for the later board of the
+    path that saves the most moves.
+
+    :param keys: The keys of the path.
+    :type keys: List[int]
+    :param index: The position of every key in keys.
+    :type index: Dict[int, int]
+    :return: The keys of the quickest way found, without keys[pos] itself,
+        and the position in keys it ends at, or (None, None) if no board
+        further on can be reached in fewer moves than the path takes.
+    :rtype: Tuple[Optional[List[int]], Optional[int]]
+    """
+    start = keys[pos]
+    parent = {start: None}
+    layer = [start]
+    best = None
+    saved = 0
+    for depth in range(1, radius + 1):
+        next_layer = []
+        for key in layer:
+            for cell in range(20):
+                if not (key >> (3 * cell)) & 7:
+                    for mask, before, after in by_cell[cell]:
+                        if key & mask == before:
+                            child = key - before + after
+                            if child in parent:
+                                continue
+                            parent[child] = key
+                            next_layer.append(child)
+                            if index.get(child, pos) - pos - depth > saved:
+                                saved = index[child] - pos - depth
+                                best = child
+        layer = next_layer
+    if best == None:
+        return None, None
+    segment = [best]
+    while parent[segment[-1]] != start:
+        segment.append(parent[segment[-1]])
+    segment.reverse()
+    return segment, index[best]
+
+
+def shorten_path(boards, radius=6):
+    """
+    Shorten a solution (see above), pass after pass until a pass saves
+    nothing.
+
+    :param boards: The boards from the start to the goal.
+    :type boards: List[Board]
+    :param radius: The most moves each BFS goes out from the path.
+    :type radius: int
+    :return: The boards of a path from the same start to the same goal, no
+        longer than boards, of the same engine.
+    :rtype: List[Board]
+    """
+    by_cell = templates_by_cell(build_layout_templates(4, 5), 20)
+    keys = [board.key() for board in boards]
+    while True:
+        keys = splice_cycles(keys)
+        index = {key: pos for pos, key in enumerate(keys)}
+        out = [keys[0]]
+        pos = 0
+        while pos < len(keys) - 1:
+            segment, end = shortcut(keys, index, pos, radius, by_cell)
+            if segment == None:
+                pos += 1
+                out.append(keys[pos])
+            else:
+                out.extend(segment)
+                pos = end
+        # a shortcut can pass over boards already on the path
+        out = splice_cycles(out)
+        if len(out) == len(keys):
+            break
+        keys = out
+    engine = 'bits' if isinstance(boards[0], BitBoard) else 'grid'
+    return [boards[0]] + [board_from_key(key, engine) for key in keys[1:]]
+
+
+#====================================================================================
+# Distance table
+#
+# For one set of pieces the 4x5 board has few enough boards to search them all
+# ahead of time. A backward BFS from every goal board gives the moves to the
+# goal of each board that can be solved, keyed by canonical_key. The table file
+# is a header, the sorted keys as unsigned 64 bit ints and then the distances as
+# unsigned 16 bit ints, all in the machine's byte order, so it can be memory
+# mapped and searched in place.
+
+table_magic = b'HRDT'
+table_header = struct.Struct('=4sIBBBBxxxxQ')  # magic, version, pieces, count
+
+
+def piece_counts(board):
+    """
+    :return: The number of singles, '<>' pieces and '^v' pieces on board.
+    :rtype: Tuple[int, int, int]
+    """
+    counts = {char_single: 0, '<': 0, '^': 0}
+    for i in range(5):
+        for j in range(4):
+            ch = board.cell(i, j)
+            if ch in counts:
+                counts[ch] += 1
+    return (counts[char_single], counts['<'], counts['^'])
+
+
+def build_distance_table(board):
+    """
+    Backward BFS from every goal board with the pieces of board.
+
+    :return: The moves to the goal of every board that can reach it, by
+        canonical key.
+    :rtype: Dict[int, int]
+    """
+    if not isinstance(board, BitBoard):
+        board = BitBoard.from_board(board)
+    dist = {}
+    layer = []
+    for goal in goal_boards(board):
+        key = goal.canonical_key()
+        if key not in dist:
+            dist[key] = 0
+            layer.append(goal)
+    depth = 0
+    while len(layer) > 0:
+        depth += 1
+        next_layer = []
+        for curr in layer:
+            for changed_board, space in curr.successors():
+                key = changed_board.canonical_key()
+                if key not in dist:
+                    dist[key] = depth
+                    next_layer.append(changed_board)
+        layer = next_layer
+    return dist
+
+
+def write_distance_table(board, filename):
+    """
+    Build the distance table for the pieces of board and save it.
+    """
+    dist = build_distance_table(board)
+    keys = array('Q', sorted(dist))
+    dists = array('H', [dist[key] for key in keys])
+    singles, horizontal, vertical = piece_counts(board)
+    table_file = open(filename, "wb")
+    table_file.write(table_header.pack(table_magic, movegen_version, singles, horizontal, vertical, 0, len(keys)))
+    keys.tofile(table_file)
+    dists.tofile(table_file)
+    table_file.close()
+
+
+class DistanceTable:
+    """
+    A saved distance table, memory mapped and searched in place.
+    """
+
+    def __init__(self, filename):
+        """
+        :param filename: A file written by write_distance_table.
+        :type filename: str
+        :raises ValueError: If the file is not a table of this version.
+        """
+        table_file = open(filename, "rb")
+        size = os.fstat(table_file.fileno()).st_size
+        if size < table_header.size:
+            table_file.close()
+            raise ValueError('{} is not a distance table of this version'.format(filename))
+        self.map = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+        table_file.close()
+        magic, version, singles, horizontal, vertical, pad, count = table_header.unpack_from(self.map)
+        if magic != table_magic or version != movegen_version or size < table_header.size + 10 * count:
+            raise ValueError('{} is not a distance table of this version'.format(filename))
+        self.pieces = (singles, horizontal, vertical)
+        start = table_header.size
+        view = memoryview(self.map)
+        self.keys = view[start:start + 8 * count].cast('Q')
+        self.dists = view[start + 8 * count:start + 10 * count].cast('H')
+
+    def distance(self, board):
+        """
+        :return: The moves from board to the goal, None if it cannot be solved.
+        :rtype: Optional[int]
+        :raises ValueError: If the table was built for other pieces.
+        """
+        if piece_counts(board) != self.pieces:
+            raise ValueError('the distance table was built for other pieces')
+        key = board.canonical_key()
+        i = bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            return self.dists[i]
+        return None
+
+
+def TableSearch(init_state, table, stats=None):
+    """
+    Walk from init_state to the goal, each step picking a successor that the
+    distance table puts one move closer. Nothing is searched.
+
+    :return: The goal state at the end of an optimal solution, or None.
+    :rtype: Optional[State]
+    :raises ValueError: If the table was built for other pieces, or a board
+        on the way has no successor one move closer (a broken table).
+    """
+    curr = init_state
+    dist = table.distance(curr.board)
+    if dist == None:
+        return None
+    while dist > 0:
+        for s in gen_states(curr, None, None, stats):
+            if table.distance(s.board) == dist - 1:
+                curr = s
+                break
+        else:
+            raise ValueError('the distance table puts a board {} moves from the goal, but none of its successors {}'.format(dist, dist - 1))
+        dist -= 1
+    if not curr.board.goal_test():
+        raise ValueError('the distance table puts a board that is not the goal 0 moves from it')
+    return curr
+
+
+def read_pieces(lines):
+    """
+    Find the pieces drawn on the rows of a board.
+
+    :param lines: The rows of the board, as strings or lists of symbols.
+    :type lines: Iterable[str]
+    :return: The pieces, with the goal piece found once.
+    :rtype: List[Piece]
+    """
+    line_index = 0
+    pieces = []
+    g_found = False
+
+    for line in lines:
+
+        for x, ch in enumerate(line):
+
+            if ch == '^': # found vertical piece
+                pieces.append(Piece(False, False, x, line_index, 'v'))
+            elif ch == '<': # found horizontal piece
+                pieces.append(Piece(False, False, x, line_index, 'h'))
+            elif ch == char_single:
+                pieces.append(Piece(False, True, x, line_index, None))
+            elif ch == char_goal:
+                if g_found == False:
+                    pieces.append(Piece(True, False, x, line_index, None))
+                    g_found = True
+        line_index += 1
+
+    return pieces
+
+
+#====================================================================================
+# Library API: parse_board, solve and write_solution can be used without files
+
+
+def parse_board(text, engine='grid'):
+    """
+    Build the board drawn in text, five rows of four symbols.
+
+    :param text: The board, as found in a puzzle file.
+    :type text: str
+    :param engine: The board representation (one of 'grid' or 'bits').
+    :type engine: str
+    :raises ValueError: If text is not a valid board.
+    :rtype: Board
+    """
+    lines = [line for line in text.splitlines() if line.strip() != '']
+    if len(lines) != 5 or any(len(line) != 4 for line in lines):
+        raise ValueError('a board is 5 rows of 4 symbols')
+    pieces = read_pieces(lines)
+    # a piece cut off by the edge of the board cannot be drawn at all
+    for piece in pieces:
+        wide = piece.is_goal or piece.orientation == 'h'
+        tall = piece.is_goal or piece.orientation == 'v'
+        if piece.coord_x + wide >= 4 or piece.coord_y + tall >= 5:
+            raise ValueError('not a valid board:\n' + '\n'.join(lines))
+    board = Board(pieces)
+    # every symbol has to belong to a whole piece, so drawing the pieces
+    # that were found gives back the same rows
+    if [''.join(line) for line in board.grid] != lines or len(board.spaces) != 2 or board.goal == None:
+        raise ValueError('not a valid board:\n' + '\n'.join(lines))
+    if engine == 'bits':
+        board = BitBoard.from_board(board)
+    return board
+
+
+def board_from_key(key, engine='grid'):
+    """
+    Build the board a key was packed from.
+
+    :param key: A board key (see pack_grid).
+    :type key: int
+    :param engine: The board representation (one of 'grid' or 'bits').
+    :type engine: str
+    :rtype: Board
+    """
+    if engine == 'bits':
+        return BitBoard.from_key(key)
+    return Board.from_key(key)
+
+
+# bump this whenever the moves Board.legality and move_table generate change;
+# cached solutions saved under another version are thrown away
+movegen_version = 1
+
+
+class SolutionCache:
+    """
+    Solutions kept in an SQLite file between runs. An entry is keyed by the
+    canonical key of the start board and the variant, the algorithm and the
+    options that change the path it finds (see cache_variant), so a board
+    and its mirror image share one entry; the path is stored as the keys of its
+    boards, mirrored if needed so that it starts from the canonical board.
+    When the cache holds more than max_entries solutions the least recently
+    used ones are dropped. Hits only note when an entry was used; the notes
+    are written with the next put, or on close, so a lookup never waits for
+    a commit.
+    """
+
+    def __init__(self, filename, max_entries=10000):
+        """
+        :param filename: The SQLite file, created if missing.
+        :type filename: str
+        :param max_entries: The most solutions kept.
+        :type max_entries: int
+        """
+        self.max_entries = max_entries
+        self.db = sqlite3.connect(filename, timeout=30)
+        self.db.execute("CREATE TABLE IF NOT EXISTS solutions ("
+                        "key INTEGER, algo TEXT, version INTEGER, path TEXT, last_used REAL, "
+                        "PRIMARY KEY (key, algo))")
+        self.db.execute("CREATE INDEX IF NOT EXISTS solutions_last_used ON solutions (last_used)")
+        self.db.execute("DELETE FROM solutions WHERE version != ?", (movegen_version,))
+        self.db.commit()
+        # (key, variant) -> last used, of the hits not written yet
+        self.used = {}
+
+    def get(self, board, algo, variant=None):
+        """
+        :param variant: The entry to look up, algo if None.
+        :type variant: Optional[str]
+        :return: The cached solution of board, None on a miss.
+        :rtype: Optional[Solution]
+        """
+        if variant == None:
+            variant = algo
+        key = board.key()
+        canonical = board.canonical_key()
+        row = self.db.execute("SELECT path FROM solutions WHERE key = ? AND algo = ? AND version = ?",
+                              (canonical, variant, movegen_version)).fetchone()
+        if row == None:
+            return None
+        self.used[(canonical, variant)] = time.time()
+        if row[0] == None:
+            return Solution(None, algo, 'no solution', SearchStats())
+        engine = 'bits' if isinstance(board, BitBoard) else 'grid'
+        boards = []
+        for word in row[0].split():
+            path_key = int(word, 16)
+            if key != canonical:
+                path_key = mirror_packed(path_key)
+            boards.append(board_from_key(path_key, engine))
+        return Solution(boards, algo, 'solved', SearchStats())
+
+    def put(self, board, solution, variant=None):
+        """
+        Save a solution of board. Solutions cut short by a limit are not kept.
+
+        :param variant: The entry to save it as, solution.algo if None.
+        :type variant: Optional[str]
+        """
+        if solution.status == 'limit':
+            return
+        if variant == None:
+            variant = solution.algo
+        key = board.key()
+        canonical = board.canonical_key()
+        path = None
+        if solution.boards != None:
+            words = []
+            for path_board in solution.boards:
+                path_key = path_board.key()
+                if key != canonical:
+                    path_key = mirror_packed(path_key)
+                words.append('{:x}'.format(path_key))
+            path = ' '.join(words)
+        self.write_used()
+        self.db.execute("INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?)",
+                        (canonical, variant, movegen_version, path, time.time()))
+        count = self.db.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+        if count > self.max_entries:
+            self.db.execute("DELETE FROM solutions WHERE rowid IN "
+                            "(SELECT rowid FROM solutions ORDER BY last_used LIMIT ?)",
+                            (count - self.max_entries,))
+        self.db.commit()
+
+    # write the last used times of the hits since the last write, the
+    # caller commits
+    def write_used(self):
+        if len(self.used) > 0:
+            self.db.executemany("UPDATE solutions SET last_used = ? WHERE key = ? AND algo = ?",
+                                [(used, key, variant) for (key, variant), used in self.used.items()])
+            self.used = {}
+
+    def close(self):
+        self.write_used()
+        self.db.commit()
+        self.db.close()
+
+
+def cache_variant(algo, mirror=False, heuristic='manhattan', tt_size=100000, shorten=0):
+    """
+    The name solve caches a solution under: the algorithm and the options
+    of solve that change the path it returns, e.g. 'astar heuristic=pdb'.
+
+    :rtype: str
+    """
+    parts = [algo]
+    if algo in ('astar', 'idastar', 'hdastar'):
+        parts.append('heuristic=' + heuristic)
+    if algo == 'idastar':
+        parts.append('tt_size={}'.format(tt_size))
+    if mirror and algo in ('dfs', 'astar'):
+        parts.append('mirror')
+    if shorten > 0:
+        parts.append('shorten={}'.format(shorten))
+    return ' '.join(parts)
+
+
+class Solution:
+    """
+    The result of solve.
+    """
+
+    def __init__(self, boards, algo, status, stats):
+        """
+        :param boards: The boards from the start to the goal, None if there
+            is no solution. With status 'limit', the best partial path if the
+            search keeps one (A*), else None.
+        :type boards: Optional[List[Board]]
+        :param algo: The searching algorithm that was used.
+        :type algo: str
+        :param status: 'solved', 'no solution' or 'limit'.
+        :type status: str
+        :param stats: The counters of the search; stats.limit names the
+            budget that ran out.
+        :type stats: SearchStats
+        """
+        self.boards = boards
+        self.algo = algo
+        self.status = status
+        self.stats = stats
+
+    @property
+    def moves(self):
+        if self.boards == None:
+            return None
+        return len(self.boards) - 1
+
+
+def set_budgets(stats, limits):
+    """
+    Give stats the budgets in limits (see solve).
+    """
+    if limits == None:
+        limits = {}
+    stats.max_nodes = limits.get('max_nodes')
+    stats.max_memory = limits.get('max_memory')
+    if limits.get('timeout') != None:
+        stats.deadline = time.perf_counter() + limits['timeout']
+
+
+def solve(board, algo='dfs', limits=None, mirror=False, heuristic='manhattan', tt_size=100000, cache=None, table=None, stats=None, workers=None, external=None, shorten=0):
+    """
+    Solve a board.
+
+    :param board: The start board.
+    :type board: Board
+    :param algo: The searching algorithm (one of 'dfs', 'astar', 'bibfs',
+        'idastar', 'hdastar', 'npbfs', 'extbfs' or 'table').
+    :type algo: str
+    :param limits: Budgets for the search: 'max_nodes' caps the states
+        expanded, 'timeout' the seconds spent searching and 'max_memory'
+        the bytes the process may hold.
+    :type limits: Optional[dict]
+    :param mirror: True to treat mirror images as the same board (dfs and astar).
+    :type mirror: bool
+    :param heuristic: The A*, IDA* and HDA* heuristic, a key of heuristics.
+    :type heuristic: str
+    :param tt_size: The IDA* transposition table size, 0 for none.
+    :type tt_size: int
+    :param cache: Looked up before searching and given the new solution,
+        under cache_variant of the options.
+    :type cache: Optional[SolutionCache]
+    :param table: The distance table the 'table' algorithm walks down.
+    :type table: Optional[DistanceTable]
+    :param stats: The counters to fill in, e.g. SearchStats(timed=True);
+        a new SearchStats if None. Its budgets are taken from limits.
+    :type stats: Optional[SearchStats]
+    :param workers: The 'hdastar' worker processes, one per CPU if None.
+    :type workers: Optional[int]
+    :param external: The 'extbfs' options, see ExternalBFS.
+    :type external: Optional[dict]
+    :param shorten: Shorten the solution with shorten_path, BFS going out
+        this many moves; 0 to keep the path the search found. Meant for
+        dfs, whose solutions are far from the shortest.
+    :type shorten: int
+    :rtype: Solution
+    """
+    if cache != None:
+        variant = cache_variant(algo, mirror, heuristic, tt_size, shorten)
+        solution = cache.get(board, algo, variant)
+        if solution != None:
+            if stats != None:
+                solution.stats = stats
+            return solution
+        solution = solve(board, algo, limits, mirror, heuristic, tt_size, None, table, stats, workers, external, shorten)
+        cache.put(board, solution, variant)
+        return solution
+
+    if stats == None:
+        stats = SearchStats()
+    set_budgets(stats, limits)
+    h = heuristics[heuristic]
+    if stats.timed:
+        start = clocks()
+    parent = State(board, 0, 0, None, h)
+    try:
+        if algo == 'astar':
+            sol = AStar(parent, None, mirror, h, stats)
+        elif algo == 'bibfs':
+            sol = BiBFS(parent, None, stats)
+        elif algo == 'idastar':
+            sol = IDAStar(parent, None, h, tt_size, stats)
+        elif algo == 'hdastar':
+            sol = HDAStar(parent, None, h, workers, stats)
+        elif algo == 'npbfs':
+            sol = NumpyBFS(parent, None, stats)
+        elif algo == 'extbfs':
+            sol = ExternalBFS(parent, None, external, stats)
+        elif algo == 'table':
+            if table == None:
+                raise ValueError("the 'table' algorithm needs a distance table")
+            sol = TableSearch(parent, table, stats)
+        else:
+            sol = DFS(parent, None, mirror, stats)
+    except SearchLimit as limit:
+        boards = None
+        if limit.best != None:
+            boards = [state.board for state in get_sol(limit.best)]
+        return Solution(boards, algo, 'limit', stats)
+    finally:
+        if stats.timed:
+            stats.add_time('search', start)
+    if sol == None:
+        return Solution(None, algo, 'no solution', stats)
+    boards = [state.board for state in get_sol(sol)]
+    if shorten > 0:
+        if stats.timed:
+            start = clocks()
+        boards = shorten_path(boards, shorten)
+        if stats.timed:
+            stats.add_time('shorten', start)
+    return Solution(boards, algo, 'solved', stats)
+
+
+# name of the piece drawn with each symbol
+piece_names = {char_goal: char_goal, char_single: char_single, '<': '<>', '>': '<>', '^': '^v', 'v': '^v'}
+
+
+def find_move(board, next_board):
+    """
+    The move that turns board into next_board.
+
+    :return: The piece moved ('1', '2', '<>' or '^v') and its top left
+        corner (row, col) before and after the move.
+    :rtype: Tuple[str, Tuple[int, int], Tuple[int, int]]
+    """
+    emptied = None
+    filled = None
+    grid, next_grid = board.grid, next_board.grid
+    for i in range(5):
+        # most rows are untouched by a move
+        if grid[i] == next_grid[i]:
+            continue
+        for j in range(4):
+            before, after = grid[i][j], next_grid[i][j]
+            if before != after and after == '.':
+                emptied = (i, j, before)
+            elif before != after and before == '.':
+                filled = (i, j, after)
+
+    def corner(b, i, j, ch):
+        if ch == char_goal:
+            return b.find_goal()
+        if ch == '>':
+            return (i, j - 1)
+        if ch == 'v':
+            return (i - 1, j)
+        return (i, j)
+
+    return (piece_names[emptied[2]], corner(board, *emptied), corner(next_board, *filled))
+
+
+def board_text(board):
+    """
+    :return: The rows of board, each ending with a newline.
+    :rtype: str
+    """
+    return '\n'.join([''.join(line) for line in board.grid]) + '\n'
+
+
+def write_solution(solution, fp, output_format='boards'):
+    """
+    Write a solution to an open file, or None if there is no solution.
+
+    The 'boards' format writes every board followed by an empty line. The
+    'moves' format writes the start board and an empty line, then one move
+    per line: the piece and the row,col of its top left corner before and
+    after the move, e.g. '<> 4,1 4,2'.
+
+    :param solution: The solution to write.
+    :type solution: Solution
+    :param fp: A file opened for writing text.
+    :type fp: TextIO
+    :param output_format: 'boards' or 'moves'.
+    :type output_format: str
+    """
+    if solution.boards == None:
+        fp.write("None")
+        return
+    if output_format == 'moves':
+        fp.write(board_text(solution.boards[0]) + '\n')
+        for board, next_board in zip(solution.boards, solution.boards[1:]):
+            piece, start, end = find_move(board, next_board)
+            fp.write('{} {},{} {},{}\n'.format(piece, start[0], start[1], end[0], end[1]))
+        return
+    # one write per board, the file's buffer does the rest
+    for board in solution.boards:
+        fp.write(board_text(board) + '\n')
+
+
+# bytes buffered before a solution file is written out
+solution_buffer = 1 << 16
+
+
+def read_from_file(filename1, filename2, algo='dfs', engine='grid', mirror=False, heuristic='manhattan', tt_size=100000, cache=None, table=None, output_format='boards', stats=None, limits=None, workers=None, shorten=0):
+    """
+    Load initial board from a given file, solve it and write the solution.
+
+    :param filename1: The name of the given file.
+    :type filename1: str
+    :param filename2: The name of the solution file.
+    :type filename2: str
+    :param algo: The searching algorithm (one of 'dfs', 'astar', 'bibfs',
+        'idastar', 'hdastar', 'npbfs', 'extbfs' or 'table').
+    :type algo: str
+    :param engine: The board representation (one of 'grid' or 'bits').
+    :type engine: str
+    :param mirror: True to treat mirror images as the same board.
+    :type mirror: bool
+    :param heuristic: The A*, IDA* and HDA* heuristic, a key of heuristics.
+    :type heuristic: str
+    :param tt_size: The IDA* transposition table size, 0 for none.
+    :type tt_size: int
+    :param cache: The solution cache, if any.
+    :type cache: Optional[SolutionCache]
+    :param table: The distance table, needed by the 'table' algorithm.
+    :type table: Optional[DistanceTable]
+    :param output_format: The solution file format, 'boards' or 'moves'.
+    :type output_format: str
+    :param stats: The counters of the search to fill in, see solve. With
+        timed stats, reading and writing the files is timed as 'io'.
+    :type stats: Optional[SearchStats]
+    :param limits: Budgets for the search, see solve. If one runs out the
+        best partial path is written, or None if the search keeps none.
+    :type limits: Optional[dict]
+    :param workers: The 'hdastar' worker processes, one per CPU if None.
+    :type workers: Optional[int]
+    :param shorten: The radius of the path shortening, see solve.
+    :type shorten: int
+    :return: A loaded board
+    :rtype: Board
+    """
+    timed = stats != None and stats.timed
+    if timed:
+        start = clocks()
+    puzzle_file = open(filename1, "r")
+    board = parse_board(puzzle_file.read(), engine)
+    puzzle_file.close()
+    if timed:
+        stats.add_time('io', start)
+
+    solution = solve(board, algo, limits, mirror, heuristic, tt_size, cache, table, stats, workers, shorten=shorten)
+
+    if timed:
+        start = clocks()
+    sol_file = open(filename2, "w", buffering=solution_buffer)
+    write_solution(solution, sol_file, output_format)
+    sol_file.close()
+    if timed:
+        stats.add_time('io', start)
+
+    return board
+
+
+def read_layout_from_file(filename1, filename2, output_format='boards', stats=None, limits=None, external=None):
+    """
+    Load a board of any size from a given file, solve it with external_bfs
+    and write the solution like write_solution does.
+
+    :param filename1: The name of the given file.
+    :type filename1: str
+    :param filename2: The name of the solution file.
+    :type filename2: str
+    :param output_format: The solution file format, 'boards' or, for the
+        4x5 board only, 'moves'.
+    :type output_format: str
+    :param stats: The counters of the search to fill in, see read_from_file.
+    :type stats: Optional[SearchStats]
+    :param limits: Budgets for the search, see solve.
+    :type limits: Optional[dict]
+    :param external: workdir, run_size, fan_in and io_buffer for external_bfs.
+    :type external: Optional[dict]
+    :return: The width, height and packed key of the board.
+    :rtype: Tuple[int, int, int]
+    :raises ValueError: If the board is not 4x5 and output_format is 'moves'.
+    """
+    if stats == None:
+        stats = SearchStats()
+    if external == None:
+        external = {}
+    timed = stats.timed
+    if timed:
+        start = clocks()
+    puzzle_file = open(filename1, "r")
+    width, height, key = parse_layout(puzzle_file.read())
+    puzzle_file.close()
+    if timed:
+        stats.add_time('io', start)
+    if output_format == 'moves' and (width, height) != (4, 5):
+        raise ValueError("the 'moves' format needs a board of 5 rows of 4 symbols")
+
+    set_budgets(stats, limits)
+    if timed:
+        start = clocks()
+    try:
+        path = external_bfs(key, width, height, stats=stats, **external)
+    except SearchLimit:
+        path = None
+    finally:
+        if timed:
+            stats.add_time('search', start)
+
+    if timed:
+        start = clocks()
+    sol_file = open(filename2, "w", buffering=solution_buffer)
+    if (width, height) == (4, 5):
+        if path != None:
+            solution = Solution([board_from_key(k) for k in path], 'extbfs', 'solved', stats)
+        else:
+            solution = Solution(None, 'extbfs', 'limit' if stats.limit != None else 'no solution', stats)
+        write_solution(solution, sol_file, output_format)
+    elif path == None:
+        sol_file.write("None")
+    else:
+        for k in path:
+            sol_file.write('\n'.join(unpack_layout(k, width, height)) + '\n\n')
+    sol_file.close()
+    if timed:
+        stats.add_time('io', start)
+
+    return width, height, key
+
+
+def solve_file(job):
+    """
+    Solve one puzzle of a batch. This runs in a worker process and never
+    raises: a puzzle that fails is reported with its error instead.
+
+    :param job: The input file, the output file and the options: engine,
+        the cache file and size, the table file, the output format, stats
+        and the keyword arguments for solve.
+    :type job: Tuple[str, str, dict]
+    :return: The report of the puzzle: file, the solution file (output),
+        status, time, nodes, moves and the budget that ran out (limit), and
+        with the stats option the SearchStats report of the search.
+    :rtype: dict
+    """
+    inputfile, outputfile, options = job
+    options = dict(options)
+    engine = options.pop('engine', 'grid')
+    cache_file = options.pop('cache_file', None)
+    cache_size = options.pop('cache_size', 10000)
+    table_file = options.pop('table_file', None)
+    output_format = options.pop('output_format', 'boards')
+    stats = SearchStats(timed=True) if options.pop('stats', False) else SearchStats()
+    report = {'file': inputfile, 'output': outputfile, 'status': None, 'time': None, 'nodes': None, 'moves': None, 'limit': None}
+    start = time.perf_counter()
+    try:
+        io_start = clocks()
+        puzzle_file = open(inputfile, "r")
+        board = parse_board(puzzle_file.read(), engine)
+        puzzle_file.close()
+        if stats.timed:
+            stats.add_time('io', io_start)
+        if table_file != None:
+            options['table'] = DistanceTable(table_file)
+        if cache_file != None:
+            cache = SolutionCache(cache_file, cache_size)
+            solution = solve(board, cache=cache, stats=stats, **options)
+            cache.close()
+        else:
+            solution = solve(board, stats=stats, **options)
+        io_start = clocks()
+        sol_file = open(outputfile, "w", buffering=solution_buffer)
+        write_solution(solution, sol_file, output_format)
+        sol_file.close()
+        if stats.timed:
+            stats.add_time('io', io_start)
+        report['status'] = solution.status
+        report['nodes'] = solution.stats.expanded
+        report['moves'] = solution.moves
+        report['limit'] = solution.stats.limit
+        if stats.timed:
+            report['stats'] = stats.report()
+    except Exception as e:
+        report['status'] = 'error: {}: {}'.format(type(e).__name__, e)
+    report['time'] = round(time.perf_counter() - start, 3)
+    return report
+
+
+def solve_batch(inputfiles, outputdir, workers=None, **options):
+    """
+    Solve many puzzles in a pool of worker processes. The solution of each
+    input file is written to outputdir as <name>_soln.txt. When files in
+    different directories share a name, the later ones, in the order of
+    inputfiles, are written as <name>_2_soln.txt, <name>_3_soln.txt and so
+    on; the report of each puzzle gives the file it was written to.
+
+    :param inputfiles: The puzzle files.
+    :type inputfiles: List[str]
+    :param outputdir: The directory for the solution files.
+    :type outputdir: str
+    :param workers: The number of worker processes, one per CPU if None.
+    :type workers: Optional[int]
+    :param options: engine, cache_file, cache_size, table_file,
+        output_format, stats and the keyword arguments for solve.
+    :return: The report of each puzzle (see solve_file), as they finish.
+    :rtype: Iterator[dict]
+    """
+    os.makedirs(outputdir, exist_ok=True)
+    jobs = []
+    names = set()
+    for inputfile in inputfiles:
+        base = os.path.splitext(os.path.basename(inputfile))[0]
+        name = base
+        copy = 1
+        while name in names:
+            copy += 1
+            name = '{}_{}'.format(base, copy)
+        names.add(name)
+        jobs.append((inputfile, os.path.join(outputdir, name + '_soln.txt'), options))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for job in jobs:
+            futures[pool.submit(solve_file, job)] = job
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                # the worker process itself died
+                yield {'file': futures[future][0], 'output': futures[future][1],
+                       'status': 'error: {}: {}'.format(type(e).__name__, e),
+                       'time': None, 'nodes': None, 'moves': None, 'limit': None}
+
+
+#====================================================================================
+# Solve service
+#
+# A long running local server, so callers do not pay for starting Python and
+# loading the tables on every puzzle. It speaks just enough HTTP/1.1 over TCP
+# or a Unix socket: POST /solve with the board text as the body, e.g.
+#
+#     curl --data-binary @puzzle.txt 'http://127.0.0.1:8000/solve?algo=astar&format=moves'
+#
+# answers with json {"status", "moves", "source", "limit", "solution"}, where
+# solution is the text write_solution would have written. GET /stats gives the
+# service counters. Searches run in a pool of worker processes. A board and its
+# mirror image are the same puzzle, so requests are keyed by the canonical key
+# of the board, the algorithm and the heuristic: a request for a puzzle that is
+# already being solved waits for that search instead of starting another, and
+# recent solutions are kept in memory, least recently used dropped first.
+
+# the algorithms the service runs; hdastar needs processes of its own and
+# table a distance table file
+service_algos = ('astar', 'dfs', 'bibfs', 'idastar', 'npbfs', 'extbfs')
+
+# longest request body accepted, in bytes
+service_max_body = 1 << 16
+
+http_reasons = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large',
+                500: 'Internal Server Error'}
+
+
+def solve_key(key, algo, heuristic, limits):
+    """
+    Solve the board packed in key. Runs in a worker process of the service.
+
+    :return: The status, the keys of the boards of the solution (or of the
+        best partial path) or None, and the budget that ran out.
+    :rtype: Tuple[str, Optional[List[int]], Optional[str]]
+    """
+    solution = solve(board_from_key(key, 'bits'), algo, limits, heuristic=heuristic)
+    path = None
+    if solution.boards != None:
+        path = [board.key() for board in solution.boards]
+    return solution.status, path, solution.stats.limit
+
+
+class SolveService:
+    """
+    Solves boards for the server, coalescing requests for the same puzzle
+    and keeping recent solutions in memory (see above).
+    """
+
+    def __init__(self, workers=None, cache_size=10000, limits=None):
+        """
+        :param workers: The worker processes, one per CPU if None.
+        :type workers: Optional[int]
+        :param cache_size: The most solutions kept in memory.
+        :type cache_size: int
+        :param limits: Budgets for every search, see solve.
+        :type limits: Optional[dict]
+        """
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.cache_size = cache_size
+        self.limits = limits
+        # (canonical key, algo, heuristic) -> (status, path from the canonical board)
+        self.cache = OrderedDict()
+        # (canonical key, algo, heuristic) -> future of the search running for it
+        self.running = {}
+        self.counts = {'requests': 0, 'searches': 0, 'coalesced': 0, 'cache_hits': 0, 'errors': 0}
+
+    async def solve(self, text, algo='astar', heuristic='manhattan', output_format='boards'):
+        """
+        Solve the board drawn in text.
+
+        :return: The status, moves, where the solution came from ('search',
+            'coalesced' or 'cache'), the budget that ran out and the
+            solution as write_solution writes it.
+        :rtype: dict
+        :raises ValueError: If text is not a valid board or an option is unknown.
+        """
+        if algo not in service_algos:
+            raise ValueError('unknown algorithm {!r}, one of {}'.format(algo, ', '.join(service_algos)))
+        if heuristic not in heuristics:
+            raise ValueError('unknown heuristic {!r}, one of {}'.format(heuristic, ', '.join(sorted(heuristics))))
+        if output_format not in ('boards', 'moves'):
+            raise ValueError("unknown format {!r}, one of boards, moves".format(output_format))
+        board = parse_board(text, 'bits')
+        self.counts['requests'] += 1
+        canonical = board.canonical_key()
+        request = (canonical, algo, heuristic)
+        limit = None
+
+        if request in self.cache:
+            self.cache.move_to_end(request)
+            self.counts['cache_hits'] += 1
+            source = 'cache'
+            status, path = self.cache[request]
+        else:
+            future = self.running.get(request)
+            if future != None:
+                self.counts['coalesced'] += 1
+                source = 'coalesced'
+            else:
+                self.counts['searches'] += 1
+                source = 'search'
+                future = asyncio.get_running_loop().run_in_executor(
+                    self.pool, solve_key, canonical, algo, heuristic, self.limits)
+                self.running[request] = future
+                future.add_done_callback(lambda done: self.finish(request, done))
+            # shielded, so a client that goes away does not cancel the
+            # search the others are waiting for
+            status, path, limit = await asyncio.shield(future)
+
+        # the path starts from the canonical board, mirror it back if needed
+        boards = None
+        if path != None:
+            mirrored = board.key() != canonical
+            boards = [board_from_key(mirror_packed(key) if mirrored else key) for key in path]
+        solution = Solution(boards, algo, status, None)
+        out = io.StringIO()
+        write_solution(solution, out, output_format)
+        return {'status': status, 'moves': solution.moves, 'source': source, 'limit': limit,
+                'solution': out.getvalue()}
+
+    def finish(self, request, future):
+        """
+        Keep the result of a search that is done, unless it was cut short by
+        a budget, and forget that it is running.
+        """
+        del self.running[request]
+        if future.cancelled() or future.exception() != None:
+            self.counts['errors'] += 1
+            return
+        status, path, limit = future.result()
+        if status == 'limit':
+            return
+        self.cache[request] = (status, path)
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+async def handle_http(service, reader, writer):
+    """
+    Answer one HTTP request on a connection of the server, then close it.
+    """
+    code = 200
+    try:
+        request_line = (await reader.readline()).decode('latin-1').split()
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, colon, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if len(request_line) != 3:
+            code, reply = 400, {'error': 'not an HTTP request'}
+        else:
+            method, target = request_line[0], urlsplit(request_line[1])
+            options = {name: values[-1] for name, values in parse_qs(target.query).items()}
+            length = int(headers.get('content-length', 0))
+            if target.path == '/stats':
+                reply = dict(service.counts, cached=len(service.cache), running=len(service.running))
+            elif target.path != '/solve':
+                code, reply = 404, {'error': 'no such path, POST /solve or GET /stats'}
+            elif method != 'POST':
+                code, reply = 405, {'error': 'POST the board to /solve'}
+            elif length > service_max_body:
+                code, reply = 413, {'error': 'a board is at most {} bytes'.format(service_max_body)}
+            else:
+                body = (await reader.readexactly(length)).decode('utf-8')
+                reply = await service.solve(body, options.get('algo', 'astar'),
+                                            options.get('heuristic', 'manhattan'),
+                                            options.get('format', 'boards'))
+    except (ValueError, UnicodeDecodeError, asyncio.IncompleteReadError) as e:
+        code, reply = 400, {'error': str(e)}
+    except Exception as e:
+        # the search itself failed, e.g. npbfs without numpy
+        code, reply = 500, {'error': '{}: {}'.format(type(e).__name__, e)}
+    data = json.dumps(reply).encode('utf-8')
+    writer.write('HTTP/1.1 {} {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\nConnection: close\r\n\r\n'
+                 .format(code, http_reasons[code], len(data)).encode('latin-1') + data)
+    try:
+        await writer.drain()
+        writer.close()
+        await writer.wait_closed()
+    except ConnectionError:
+        pass
+
+
+async def serve(host='127.0.0.1', port=8000, socket_path=None, workers=None, cache_size=10000, limits=None):
+    """
+    Run the solve service until it is cancelled or the process is
+    interrupted or killed.
+
+    :param host: The address to listen on, localhost by default.
+    :type host: str
+    :param port: The TCP port to listen on.
+    :type port: int
+    :param socket_path: Listen on this Unix socket instead of TCP.
+    :type socket_path: Optional[str]
+    :param workers: The worker processes, one per CPU if None.
+    :type workers: Optional[int]
+    :param cache_size: The most solutions kept in memory.
+    :type cache_size: int
+    :param limits: Budgets for every search, see solve.
+    :type limits: Optional[dict]
+    """
+    service = SolveService(workers, cache_size, limits)
+
+    def connected(reader, writer):
+        return handle_http(service, reader, writer)
+
+    if socket_path != None:
+        server = await asyncio.start_unix_server(connected, socket_path)
+    else:
+        server = await asyncio.start_server(connected, host, port)
+    # stop on Ctrl-C or kill, so the worker processes are shut down too
+    main = asyncio.current_task()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            asyncio.get_running_loop().add_signal_handler(signum, main.cancel)
+        except NotImplementedError:  # not on Windows
+            pass
+    try:
+        async with server:
+            await server.serve_forever()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--inputfile",
+        type=str,
+        help="The input file that contains the puzzle."
+    )
+    parser.add_argument(
+        "--outputfile",
+        type=str,
+        help="The output file that contains the solution."
+    )
+    parser.add_argument(
+        "--algo",
+        type=str,
+        choices=['astar', 'dfs', 'bibfs', 'idastar', 'hdastar', 'npbfs', 'extbfs', 'table'],
+        help="The searching algorithm."
+    )
+    parser.add_argument(
+        "--engine",
+        type=str,
+        default='grid',
+        choices=['grid', 'bits'],
+        help="The board representation used by the search."
+    )
+    parser.add_argument(
+        "--mirror",
+        action='store_true',
+        help="Treat a board and its left-right mirror image as the same board (dfs and astar)."
+    )
+    parser.add_argument(
+        "--heuristic",
+        type=str,
+        default='manhattan',
+        choices=sorted(heuristics),
+        help="The heuristic used by A*, IDA* and HDA*."
+    )
+    parser.add_argument(
+        "--tt-size",
+        type=int,
+        default=100000,
+        help="Boards kept in the IDA* transposition table, 0 for none."
+    )
+    parser.add_argument(
+        "--inputdir",
+        type=str,
+        help="Solve every file in this directory (batch mode, needs --outputdir)."
+    )
+    parser.add_argument(
+        "--manifest",
+        type=str,
+        help="Solve every file listed in this file, one per line (batch mode, needs --outputdir)."
+    )
+    parser.add_argument(
+        "--outputdir",
+        type=str,
+        help="The directory batch mode writes the solutions to."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="The number of batch worker processes, hdastar search processes or service worker processes, one per CPU by default."
+    )
+    parser.add_argument(
+        "--format",
+        type=str,
+        default='boards',
+        choices=['boards', 'moves'],
+        help="Write every board of the solution, or the start board and one move per line."
+    )
+    parser.add_argument(
+        "--cache",
+        type=str,
+        metavar="FILE",
+        help="SQLite file of solutions to reuse, created if missing."
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=10000,
+        help="The most solutions kept in the cache, or in the memory of the service."
+    )
+    parser.add_argument(
+        "--table",
+        type=str,
+        metavar="FILE",
+        help="The distance table used by --algo table."
+    )
+    parser.add_argument(
+        "--build-table",
+        type=str,
+        metavar="FILE",
+        help="Build the distance table for the pieces of --inputfile into FILE and exit."
+    )
+    parser.add_argument(
+        "--build-pdb",
+        action='store_true',
+        help="Build the pattern database used by --heuristic pdb again, into " + os.path.basename(pdb_file) + ", and exit."
+    )
+    parser.add_argument(
+        "--max-nodes",
+        type=int,
+        help="Stop the search after expanding this many states."
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        help="Stop the search after this many seconds."
+    )
+    parser.add_argument(
+        "--max-memory",
+        type=int,
+        metavar="MB",
+        help="Stop the search once the process holds this many megabytes."
+    )
+    parser.add_argument(
+        "--workdir",
+        type=str,
+        metavar="DIR",
+        help="The directory --algo extbfs keeps its layers in; a search stopped early carries on from it. A temporary directory by default."
+    )
+    parser.add_argument(
+        "--run-size",
+        type=int,
+        default=ext_run_size,
+        help="Boards --algo extbfs sorts in memory before writing them out as a run."
+    )
+    parser.add_argument(
+        "--fan-in",
+        type=int,
+        default=ext_fan_in,
+        help="Runs --algo extbfs merges at once."
+    )
+    parser.add_argument(
+        "--io-buffer",
+        type=int,
+        default=ext_io_buffer,
+        metavar="BYTES",
+        help="Bytes --algo extbfs buffers for every file it writes."
+    )
+    parser.add_argument(
+        "--shorten",
+        type=int,
+        default=0,
+        metavar="RADIUS",
+        help="Shorten the solution found, e.g. by dfs: cut out repeated boards and take shortcuts found by BFS of at most RADIUS moves from the path (6 is a good start)."
+    )
+    parser.add_argument(
+        "--serve",
+        action='store_true',
+        help="Run the solve service: POST a board to /solve over HTTP (see the Solve service section)."
+    )
+    parser.add_argument(
+        "--host",
+        type=str,
+        default='127.0.0.1',
+        help="The address the service listens on."
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8000,
+        help="The TCP port the service listens on."
+    )
+    parser.add_argument(
+        "--socket",
+        type=str,
+        metavar="PATH",
+        help="Listen on this Unix socket instead of TCP."
+    )
+    parser.add_argument(
+        "--stats",
+        action='store_true',
+        help="Print the search counters and the time of each phase as JSON."
+    )
+    args = parser.parse_args()
+
+    if args.build_pdb:
+        write_pdb()
+        sys.exit(0)
+    if args.build_table:
+        if args.inputfile == None:
+            parser.error("--build-table needs --inputfile")
+        puzzle_file = open(args.inputfile, "r")
+        write_distance_table(parse_board(puzzle_file.read(), 'bits'), args.build_table)
+        puzzle_file.close()
+        sys.exit(0)
+    if args.algo == 'table' and args.table == None:
+        parser.error("--algo table needs --table")
+
+    limits = {'max_nodes': args.max_nodes, 'timeout': args.timeout, 'max_memory': None}
+    if args.max_memory != None:
+        limits['max_memory'] = args.max_memory * 1024 * 1024
+    external = {'workdir': args.workdir, 'run_size': args.run_size, 'fan_in': args.fan_in, 'io_buffer': args.io_buffer}
+
+    if args.serve:
+        asyncio.run(serve(args.host, args.port, args.socket, args.workers, args.cache_size, limits))
+        sys.exit(0)
+
+    if args.inputdir != None or args.manifest != None:
+        if args.outputdir == None or args.algo == None:
+            parser.error("batch mode needs --outputdir and --algo")
+        if args.algo == 'hdastar':
+            parser.error("--algo hdastar already uses every worker for one puzzle, it cannot run in batch mode")
+        if args.workdir != None:
+            parser.error("--workdir holds the layers of one search, it cannot be used in batch mode")
+        inputfiles = []
+        if args.inputdir != None:
+            for name in sorted(os.listdir(args.inputdir)):
+                if os.path.isfile(os.path.join(args.inputdir, name)):
+                    inputfiles.append(os.path.join(args.inputdir, name))
+        if args.manifest != None:
+            manifest = open(args.manifest, "r")
+            for line in manifest:
+                if line.strip() != '':
+                    inputfiles.append(line.strip())
+            manifest.close()
+        options = {'algo': args.algo, 'engine': args.engine, 'mirror': args.mirror,
+                   'heuristic': args.heuristic, 'tt_size': args.tt_size,
+                   'cache_file': args.cache, 'cache_size': args.cache_size,
+                   'table_file': args.table, 'output_format': args.format,
+                   'stats': args.stats, 'limits': limits, 'external': external,
+                   'shorten': args.shorten}
+        failed = 0
+        # one json report per puzzle, in the order they finish
+        for report in solve_batch(inputfiles, args.outputdir, args.workers, **options):
+            print(json.dumps(report), flush=True)
+            if report['status'] != 'solved':
+                failed += 1
+        sys.exit(1 if failed > 0 else 0)
+
+    if args.inputfile == None or args.outputfile == None or args.algo == None:
+        parser.error("--inputfile, --outputfile and --algo are required")
+
+    cache = None
+    if args.cache != None:
+        cache = SolutionCache(args.cache, args.cache_size)
+    table = None
+    if args.table != None:
+        try:
+            table = DistanceTable(args.table)
+        except ValueError as e:
+            parser.error(str(e))
+
+    stats = SearchStats(timed=args.stats)
+
+    # read the board from the file
+    if args.algo == 'extbfs':
+        # any size of board
+        try:
+            read_layout_from_file(args.inputfile, args.outputfile, args.format, stats, limits, external)
+        except ValueError as e:
+            parser.error(str(e))
+    else:
+        try:
+            board = read_from_file(args.inputfile, args.outputfile, args.algo, args.engine, args.mirror, args.heuristic, args.tt_size, cache, table, args.format, stats, limits, args.workers, args.shorten)
+        except ValueError as e:
+            parser.error(str(e))
+        except RuntimeError as e:
+            # an hdastar worker failed
+            print("{}: {}".format(parser.prog, e), file=sys.stderr)
+            sys.exit(1)
+
+    if cache != None:
+        cache.close()
+    if args.stats:
+        print(json.dumps(stats.report()))
+    if stats.limit != None:
+        print("{}: search stopped, {} reached".format(parser.prog, stats.limit), file=sys.stderr)
+        sys.exit(1)
+    
+
+
+# test it on more inputs
+# successor function @Intput: board , @Output: list of board 
+# legal_moves,  for each move in legal_moves : apply(board,move): @Output: Board
+# a list of boards -> will be the successor or in dfs terms neighbours of the board (@Intput)
+
@@ -0,0 +1,28 @@
+"""
+solve_batch writes one solution file per puzzle, even when puzzles from
+different directories share a name.
+"""
+
+import os
+
+import hrd
+from benchmarks.corpus import named_layouts
+
+
+def test_same_names_do_not_overwrite(tmp_path):
+    inputfiles = []
+    for folder, name in (('a', 'all_across'), ('b', 'one_move')):
+        os.makedirs(str(tmp_path / folder))
+        inputfile = str(tmp_path / folder / 'puzzle.txt')
+        puzzle_out = open(inputfile, "w")
+        puzzle_out.write(named_layouts[name])
+        puzzle_out.close()
+        inputfiles.append(inputfile)
+    outputdir = str(tmp_path / 'out')
+    reports = {report['file']: report for report in hrd.solve_batch(inputfiles, outputdir, 1, algo='astar')}
+    assert sorted(os.listdir(outputdir)) == ['puzzle_2_soln.txt', 'puzzle_soln.txt']
+    assert reports[inputfiles[0]]['output'] == os.path.join(outputdir, 'puzzle_soln.txt')
+    assert reports[inputfiles[1]]['output'] == os.path.join(outputdir, 'puzzle_2_soln.txt')
+    for inputfile, moves in zip(inputfiles, (42, 1)):
+        assert reports[inputfile]['status'] == 'solved'
+        assert reports[inputfile]['moves'] == moves
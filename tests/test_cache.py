@@ -0,0 +1,31 @@
+"""
+SolutionCache keeps one entry per start board and variant, and notes the
+hits it served without committing on every lookup.
+"""
+
+import hrd
+from benchmarks.corpus import named_layouts
+
+
+def test_variants_are_kept_apart(tmp_path):
+    cache = hrd.SolutionCache(str(tmp_path / 'cache.db'))
+    board = hrd.parse_board(named_layouts['all_across'])
+    dfs = hrd.solve(board, 'dfs', cache=cache)
+    shortened = hrd.solve(board, 'dfs', cache=cache, shorten=6)
+    assert shortened.moves < dfs.moves
+    assert hrd.solve(board, 'dfs', cache=cache).moves == dfs.moves
+    assert hrd.solve(board, 'dfs', cache=cache, shorten=6).moves == shortened.moves
+    cache.close()
+
+
+def test_hits_are_written_on_close(tmp_path):
+    filename = str(tmp_path / 'cache.db')
+    cache = hrd.SolutionCache(filename)
+    board = hrd.parse_board(named_layouts['all_across'])
+    cache.put(board, hrd.solve(board, 'astar'))
+    saved = cache.db.execute("SELECT last_used FROM solutions").fetchone()[0]
+    assert cache.get(board, 'astar').moves == 42
+    cache.close()
+    cache = hrd.SolutionCache(filename)
+    assert cache.db.execute("SELECT last_used FROM solutions").fetchone()[0] > saved
+    cache.close()
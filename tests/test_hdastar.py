@@ -0,0 +1,18 @@
+"""
+HDA* stops only once no state is left that could beat its incumbent, so it
+finds solutions exactly as short as A* with any number of workers.
+"""
+
+import pytest
+
+import hrd
+from benchmarks.corpus import named_layouts
+
+
+@pytest.mark.parametrize('workers', [2, 4])
+@pytest.mark.parametrize('name', sorted(named_layouts))
+def test_same_length_as_astar(name, workers):
+    astar = hrd.solve(hrd.parse_board(named_layouts[name], 'bits'), 'astar')
+    hdastar = hrd.solve(hrd.parse_board(named_layouts[name], 'bits'), 'hdastar', workers=workers)
+    assert hdastar.status == astar.status == 'solved'
+    assert hdastar.moves == astar.moves
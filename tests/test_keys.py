@@ -0,0 +1,84 @@
+"""
+Board keys must only depend on the shapes drawn on the board, never on which
+Piece covers a cell (see Board keys in hrd.py).
+"""
+
+from random import Random
+
+import hrd
+from benchmarks.corpus import named_layouts
+
+
+def sample_boards(count=200):
+    """
+    :return: The named layouts and boards a few moves from them.
+    :rtype: List[hrd.Board]
+    """
+    boards = []
+    for text in named_layouts.values():
+        seen = set()
+        layer = [hrd.parse_board(text)]
+        while len(layer) > 0 and len(seen) < count:
+            next_layer = []
+            for board in layer:
+                if board.key() not in seen:
+                    seen.add(board.key())
+                    boards.append(board)
+                    next_layer.extend(changed for changed, space in board.successors())
+            layer = next_layer
+    return boards
+
+
+def test_key_ignores_piece_order():
+    rng = Random(0)
+    for board in sample_boards():
+        for i in range(3):
+            pieces = hrd.read_pieces(board.grid)
+            rng.shuffle(pieces)
+            shuffled = hrd.Board(pieces)
+            assert shuffled.key() == board.key()
+            assert hrd.BitBoard.from_board(shuffled).key() == board.key()
+
+
+def test_key_ignores_swapping_equal_pieces():
+    for board in sample_boards():
+        # a board reached by a move keeps the pieces of the board it came
+        # from, its grid is what counts
+        drawn = hrd.read_pieces(board.grid)
+        for shape in ('single', 'h', 'v'):
+            same = [piece for piece in drawn if not piece.is_goal
+                    and (piece.is_single if shape == 'single' else piece.orientation == shape)]
+            if len(same) < 2:
+                continue
+            first, second = same[0], same[1]
+            pieces = [piece for piece in drawn if piece is not first and piece is not second]
+            # the two pieces trade places
+            pieces.append(hrd.Piece(first.is_goal, first.is_single, second.coord_x, second.coord_y, first.orientation))
+            pieces.append(hrd.Piece(second.is_goal, second.is_single, first.coord_x, first.coord_y, second.orientation))
+            assert hrd.Board(pieces).key() == board.key()
+
+
+def test_pack_unpack_round_trip():
+    for board in sample_boards():
+        key = hrd.pack_grid(board.grid)
+        assert hrd.unpack_grid(key) == board.grid
+        assert hrd.pack_grid(hrd.unpack_grid(key)) == key
+        assert hrd.board_from_key(key).key() == key
+        assert hrd.board_from_key(key, 'bits').key() == key
+
+
+def test_grid_and_bit_keys_agree():
+    for board in sample_boards():
+        bits = hrd.BitBoard.from_board(board)
+        assert bits.key() == board.key()
+        assert bits.canonical_key() == board.canonical_key()
+        assert sorted(changed.key() for changed, space in bits.successors()) == \
+            sorted(changed.key() for changed, space in board.successors())
+
+
+def test_mirror_twice_is_identity():
+    for board in sample_boards():
+        key = board.key()
+        assert hrd.mirror_packed(hrd.mirror_packed(key)) == key
+        mirrored = '\n'.join(''.join(row[::-1]).translate(hrd.mirror_chars) for row in board.grid)
+        assert hrd.parse_board(mirrored).key() == board.mirror_key()
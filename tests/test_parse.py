@@ -0,0 +1,30 @@
+"""
+parse_board rejects every malformed board with a ValueError, which the CLI
+and the solve service report as a usage error.
+"""
+
+import pytest
+
+import hrd
+from benchmarks.corpus import named_layouts
+
+# pieces whose other half would fall off the board
+cut_off = [
+    '.1..\n.11.\n2222\n2222\n.^..',   # '^' in the bottom row
+    '11^.\n11v.\n2222\n222<\n22..',   # '<' in the last column
+    '...1\n.2.1\n2222\n2222\n2222',   # goal in the last column
+    '.22.\n2222\n2222\n2222\n.211',   # goal in the bottom row
+]
+
+
+@pytest.mark.parametrize('text', cut_off)
+@pytest.mark.parametrize('engine', ['grid', 'bits'])
+def test_cut_off_piece(text, engine):
+    with pytest.raises(ValueError):
+        hrd.parse_board(text, engine)
+
+
+@pytest.mark.parametrize('name', sorted(named_layouts))
+def test_named_layouts_parse(name):
+    board = hrd.parse_board(named_layouts[name])
+    assert [''.join(line) for line in board.grid] == named_layouts[name].split()
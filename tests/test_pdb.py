@@ -0,0 +1,26 @@
+"""
+The pattern database on disk is only trusted when it was built with the
+current pdb_version and movegen_version (see Pattern database in hrd.py).
+"""
+
+import hrd
+
+
+def test_shipped_database_is_current():
+    pdb_in = open(hrd.pdb_file, "r")
+    header = pdb_in.readline()
+    pdb_in.close()
+    assert header == hrd.pdb_header()
+
+
+def test_stale_database_is_rebuilt(tmp_path):
+    filename = str(tmp_path / 'pdb.txt')
+    stale = open(filename, "w")
+    stale.write('0 0 0 2 0 3 99\n')
+    stale.close()
+    hrd.pdb.clear()
+    hrd.load_pdb(filename)
+    assert hrd.pdb == hrd.build_pdb()
+    rebuilt = open(filename, "r")
+    assert rebuilt.readline() == hrd.pdb_header()
+    rebuilt.close()
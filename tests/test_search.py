@@ -0,0 +1,155 @@
+"""
+Every optimal search finds a solution of the optimal length on the named
+layouts, and every search hands back a path of legal single moves from the
+start board to a goal.
+"""
+
+import pytest
+
+import hrd
+from benchmarks.corpus import named_layouts
+from benchmarks.run import modes
+
+# moves in an optimal solution of every named layout
+optimal_moves = {'heng_dao_li_ma': 114, 'soln_dump': 52, 'all_across': 42, 'one_move': 1}
+
+# the searches that promise an optimal solution, by benchmark mode
+optimal_modes = ['astar', 'astar-bits', 'astar-pdb', 'bibfs', 'idastar', 'npbfs', 'extbfs']
+
+
+def solve_mode(name, mode, **extra):
+    """
+    :return: The solution of a named layout by a benchmark mode.
+    :rtype: hrd.Solution
+    """
+    options = dict(modes[mode])
+    engine = options.pop('engine', 'grid')
+    options.update(extra)
+    return hrd.solve(hrd.parse_board(named_layouts[name], engine), **options)
+
+
+def assert_legal(text, boards):
+    """
+    Check that boards starts on the board drawn in text, that each board is
+    one move from the one before, and that the last one is a goal.
+    """
+    assert boards[0].key() == hrd.parse_board(text).key()
+    for board, next_board in zip(boards, boards[1:]):
+        assert next_board.key() in [child.key() for child, space in board.successors()]
+    assert boards[-1].goal_test()
+
+
+@pytest.mark.parametrize('mode', optimal_modes)
+@pytest.mark.parametrize('name', sorted(named_layouts))
+def test_optimal_length(name, mode):
+    solution = solve_mode(name, mode)
+    assert solution.status == 'solved'
+    assert solution.moves == optimal_moves[name]
+    assert_legal(named_layouts[name], solution.boards)
+
+
+@pytest.mark.parametrize('name', sorted(named_layouts))
+def test_dfs_path_is_legal(name):
+    solution = solve_mode(name, 'dfs')
+    assert solution.status == 'solved'
+    assert_legal(named_layouts[name], solution.boards)
+
+
+@pytest.mark.parametrize('engine', ['grid', 'bits'])
+def test_astar_is_deterministic(engine):
+    # ties are broken by h then insertion order, so the same path comes back
+    board = hrd.parse_board(named_layouts['soln_dump'], engine)
+    first = hrd.solve(board, 'astar')
+    second = hrd.solve(board, 'astar')
+    assert [b.key() for b in first.boards] == [b.key() for b in second.boards]
+
+
+@pytest.mark.parametrize('engine', ['grid', 'bits'])
+@pytest.mark.parametrize('name', sorted(named_layouts))
+def test_goal_boards(name, engine):
+    # bibfs seeds its backward side with these: distinct goal boards made of
+    # the same pieces as the layout
+    board = hrd.parse_board(named_layouts[name], engine)
+    goals = hrd.goal_boards(board)
+    assert len(goals) > 0
+    assert len(set(goal.key() for goal in goals)) == len(goals)
+    symbols = sorted(named_layouts[name].replace('\n', ''))
+    for goal in goals:
+        assert goal.goal_test()
+        assert sorted(hrd.board_text(goal).replace('\n', '')) == symbols
+
+
+@pytest.mark.parametrize('name, tt_size', [('all_across', 400), ('one_move', 0), ('one_move', 400)])
+def test_idastar_table_sizes(name, tt_size):
+    # a table small enough to keep dropping boards, and none at all where
+    # the layout is easy enough to search without one
+    solution = solve_mode(name, 'idastar', tt_size=tt_size)
+    assert solution.moves == optimal_moves[name]
+    assert_legal(named_layouts[name], solution.boards)
+
+
+def boards_closer(text, depth):
+    """
+    :return: The boards fewer than depth moves from the board drawn in text,
+        counted by a plain breadth first search.
+    :rtype: int
+    """
+    board = hrd.parse_board(text)
+    seen = set([board.key()])
+    layer = [board]
+    count = 0
+    for i in range(depth):
+        count += len(layer)
+        next_layer = []
+        for board in layer:
+            for child, space in board.successors():
+                if child.key() not in seen:
+                    seen.add(child.key())
+                    next_layer.append(child)
+        layer = next_layer
+    return count
+
+
+@pytest.mark.parametrize('name', ['soln_dump', 'all_across', 'one_move'])
+def test_npbfs_layers(name):
+    # npbfs expands whole layers up to the one before the goal, so a board
+    # lost or kept twice by the vectorized deduplication shows in the count
+    stats = hrd.SearchStats()
+    solve_mode(name, 'npbfs', stats=stats)
+    assert stats.expanded == boards_closer(named_layouts[name], optimal_moves[name])
+
+
+@pytest.mark.parametrize('name', ['soln_dump', 'all_across'])
+def test_extbfs_resume(name, tmp_path):
+    # small runs and fan in, so children are spilled and merged in passes
+    external = {'workdir': str(tmp_path), 'run_size': 256, 'fan_in': 2}
+    whole = solve_mode(name, 'extbfs')
+    stopped = solve_mode(name, 'extbfs', limits={'max_nodes': 1000}, external=external)
+    assert stopped.status == 'limit'
+    resumed_stats = hrd.SearchStats()
+    resumed = solve_mode(name, 'extbfs', external=external, stats=resumed_stats)
+    assert [board.key() for board in resumed.boards] == [board.key() for board in whole.boards]
+    # the layers written before the stop were not searched again
+    assert resumed_stats.expanded < boards_closer(named_layouts[name], optimal_moves[name])
+
+
+@pytest.mark.parametrize('engine', ['grid', 'bits'])
+@pytest.mark.parametrize('name', sorted(named_layouts))
+def test_shorten_path(name, engine):
+    boards = solve_mode(name, 'dfs').boards
+    if engine == 'bits':
+        boards = [hrd.BitBoard.from_board(board) for board in boards]
+    shortened = hrd.shorten_path(boards, 4)
+    assert len(shortened) <= len(boards)
+    assert len(shortened) - 1 >= optimal_moves[name]
+    assert all(isinstance(board, type(boards[0])) for board in shortened)
+    assert_legal(named_layouts[name], shortened)
+
+
+def test_shorten_splices_detours():
+    # a path that goes out and comes back over the same boards
+    boards = solve_mode('all_across', 'astar').boards
+    detour = [child for child, space in boards[5].successors()][:1]
+    padded = boards[:6] + detour + boards[5:]
+    shortened = hrd.shorten_path(padded, 1)
+    assert [board.key() for board in shortened] == [board.key() for board in boards]
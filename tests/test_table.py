@@ -0,0 +1,45 @@
+"""
+TableSearch only trusts a distance table while it stays consistent: a table
+that leads nowhere is reported, never turned into a wrong solution.
+"""
+
+import pytest
+
+import hrd
+from benchmarks.corpus import named_layouts
+
+
+class FixedTable:
+    """
+    A stand-in for DistanceTable that puts the start board dist moves from
+    the goal and every other board rest moves away.
+    """
+
+    def __init__(self, start, dist, rest):
+        self.start = start.key()
+        self.dist = dist
+        self.rest = rest
+
+    def distance(self, board):
+        return self.dist if board.key() == self.start else self.rest
+
+
+def start_state():
+    return hrd.State(hrd.parse_board(named_layouts['heng_dao_li_ma']), 0, 0)
+
+
+def test_no_successor_closer():
+    state = start_state()
+    with pytest.raises(ValueError):
+        hrd.TableSearch(state, FixedTable(state.board, 5, None))
+
+
+def test_walk_ends_off_the_goal():
+    state = start_state()
+    with pytest.raises(ValueError):
+        hrd.TableSearch(state, FixedTable(state.board, 1, 0))
+
+
+def test_unsolvable():
+    state = start_state()
+    assert hrd.TableSearch(state, FixedTable(state.board, None, None)) == None